@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Asyncio run mode for Auto Code Generator
+Keeps generation and local commits on schedule while pushes run in the background
+"""
+
+import time
+import asyncio
+import datetime
+import logging
+from typing import Dict, Tuple
+
+from vcs import push_error
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPipeline:
+    """Overlaps generation/commit with background `git push` tasks
+
+    Generation and the local add/commit run in the default executor so the
+    event loop stays responsive. Pushes run as `asyncio.create_subprocess_exec`
+    tasks limited by a semaphore; each remote is pushed concurrently and
+    killed after its own timeout. A push that is still waiting for a slot
+    already covers any newer commits, so further push requests are coalesced
+    into it. Commits come from the
+    generator's push queue, and failed pushes are retried from the scheduler
+    loop once their backoff expires.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.semaphore = asyncio.Semaphore(generator.push_concurrency)
+        self.tasks = set()
+        self.waiting_push = None
+
+    async def run_git_push(self, force: bool = True) -> bool:
+        """Wait for a push slot, flush the push queue and record the push metrics"""
+        generator = self.generator
+        queue = generator.push_queue
+        async with self.semaphore:
+            self.waiting_push = None
+            started = time.monotonic()
+            run = generator.metrics.new_run()
+            due = queue.due_remotes(force=force)
+            tips = {name: queue.tip(name) for name in due}
+            remotes = [remote for remote in generator.remotes if remote['name'] in due]
+            results = await asyncio.gather(*(self.push_process(remote, run) for remote in remotes))
+            ok = True
+            for remote, (pushed, detail) in zip(remotes, results):
+                if pushed:
+                    queue.ack(remote['name'], tips[remote['name']])
+                else:
+                    delay = queue.fail(remote['name'], detail)
+                    logger.warning(f"Push to {remote['name']} failed, retrying in {delay:.0f}s")
+                    ok = False
+            run.record('push', time.monotonic() - started, ok)
+            generator.export_queue_gauges()
+            generator.metrics.finish(run, status='pushed' if ok else 'push_failed')
+            return ok
+
+    async def push_process(self, remote: Dict, run=None) -> Tuple[bool, str]:
+        """Run `git push` to one remote as an asyncio subprocess, killing it on timeout"""
+        generator = self.generator
+        started = time.monotonic()
+        command = generator.push_command(remote)
+        if command is None:
+            ok, detail = generator.push_remote(remote)
+        else:
+            ok, detail = await self.run_push_command(command, remote['timeout'])
+        seconds = time.monotonic() - started
+        if run is not None:
+            run.record(f"push.{remote['name']}", seconds, ok)
+        if ok:
+            logger.info(f"Successfully pushed {generator.branch} to {remote['name']} in {seconds:.2f}s")
+        else:
+            logger.error(f"Error pushing to {remote['name']}: {detail}")
+        return ok, detail
+
+    async def run_push_command(self, command, timeout: float) -> Tuple[bool, str]:
+        """Run a push command line, returning (ok, detail)"""
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=self.generator.repo_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return False, f"timed out after {timeout:g}s"
+        if process.returncode != 0:
+            return False, push_error(stderr.decode(errors='replace'), process.returncode)
+        return True, 'ok'
+
+    def request_push(self, force: bool = True):
+        """Start a background push unless one is already waiting for a slot"""
+        if not self.generator.remotes:
+            logger.warning("No remote URL configured, commit made locally only")
+            return
+        if self.waiting_push is not None:
+            logger.info("Push already queued, coalescing")
+            return
+        task = asyncio.get_running_loop().create_task(self.run_git_push(force))
+        self.waiting_push = task
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def trigger(self):
+        """Generate and commit in the executor, then hand the push to the background"""
+        loop = asyncio.get_running_loop()
+        run = self.generator.new_run()
+        committed = await loop.run_in_executor(None, self.commit_run, run)
+        status = 'committed' if committed else 'failed'
+        self.generator.metrics.finish(run, status=status)
+        self.generator.catalog_run(run, status)
+        if committed:
+            self.request_push()
+        logger.info("Code generation completed, push running in background")
+
+    def commit_run(self, run) -> bool:
+        """Generate and commit on an executor thread, profiled there when due"""
+        with self.generator.run_profiler():
+            committed = self.generator.generate_and_commit(None, run)
+            if committed:
+                self.generator.track_repo_objects()
+        return committed
+
+    async def drain(self):
+        """Wait for every outstanding push to finish"""
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def run_once(self):
+        """Run a single trigger and wait for its push"""
+        await self.trigger()
+        await self.drain()
+
+    async def run_scheduler(self, max_nap: float = 300):
+        """Async counterpart of AutoCodeGenerator.run_scheduler"""
+        generator = self.generator
+        logger.info(f"Starting async scheduler with {len(generator.schedule.expressions)} trigger(s)...")
+        last_fire = generator.load_last_fire()
+        try:
+            while True:
+                now = datetime.datetime.now()
+                due, runs = generator.due_triggers(last_fire, now)
+                if due:
+                    for fire in runs:
+                        logger.info(f"Trigger time reached: {fire}")
+                        await self.trigger()
+                        generator.record_fire(fire)
+                    last_fire = due[-1]
+                    generator.record_fire(last_fire)
+                    continue
+
+                next_fire = generator.schedule.next_fire(now)
+                if next_fire is None:
+                    logger.error("Schedule has no upcoming trigger times, stopping scheduler")
+                    return
+                logger.info(f"Next trigger at {next_fire}")
+                await asyncio.get_running_loop().run_in_executor(
+                    None, generator.maintain_between_triggers, next_fire)
+                while True:
+                    remaining = (next_fire - datetime.datetime.now()).total_seconds()
+                    if remaining <= 0:
+                        break
+                    nap = min(remaining, max_nap)
+                    if generator.config_file:
+                        nap = min(nap, generator.config_reload_interval)
+                    retry_at = generator.push_queue.next_attempt()
+                    if retry_at is not None and not self.tasks:
+                        if retry_at <= time.time():
+                            self.request_push(force=False)
+                        else:
+                            nap = min(nap, retry_at - time.time())
+                    await asyncio.sleep(nap)
+                    now = datetime.datetime.now()
+                    if now < next_fire and generator.config_file and generator.reload_config():
+                        # Slots of the new schedule before the reload are not caught up
+                        last_fire = now
+                        generator.record_fire(last_fire)
+                        break
+        finally:
+            await self.drain()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Crash-safe file writes for Auto Code Generator
+Files are written to a temporary name and renamed into place, so a crash
+never leaves a half-written file at the final path
+"""
+
+import os
+import logging
+from typing import Iterable, List, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 'none': atomic rename only; 'batch': one directory flush per burst; 'always': fsync every file
+DURABILITY_MODES = ('none', 'batch', 'always')
+
+
+def temp_path(path: str) -> str:
+    """Hidden temporary name next to path (same directory, so the rename is atomic)"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.tmp{os.getpid()}")
+
+
+def sync_file(fd: int, full: bool = True):
+    """Flush a file's data to stable storage
+
+    On macOS fsync() only reaches the drive's cache, so with full,
+    F_FULLFSYNC (which also flushes the drive cache) is used where it
+    exists; otherwise fdatasync() skips the metadata-only flush when the
+    platform has it.
+    """
+    if full and full_sync_supported():
+        try:
+            fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+            return
+        except OSError:
+            pass
+    if hasattr(os, 'fdatasync'):
+        os.fdatasync(fd)
+    else:
+        os.fsync(fd)
+
+
+def full_sync_supported() -> bool:
+    """Whether the platform has F_FULLFSYNC (macOS)"""
+    return fcntl is not None and hasattr(fcntl, 'F_FULLFSYNC')
+
+
+def flush_device(path: str):
+    """Flush the drive cache of the device holding path with one F_FULLFSYNC"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.fcntl(fd, fcntl.F_FULLFSYNC)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(directory: str):
+    """fsync a directory so renames into it survive a crash (no-op where unsupported)"""
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_data(f, data: Union[str, Iterable[str]]):
+    """Write a string, or an iterable of chunks one at a time"""
+    if isinstance(data, str):
+        f.write(data)
+    else:
+        for chunk in data:
+            f.write(chunk)
+
+
+def write_atomic(path: str, data: Union[str, Iterable[str]], fsync: bool = False):
+    """Write data (a string or chunks) to path via a temporary file and os.replace
+
+    With fsync, the file is flushed before the rename and its directory
+    after it, so the new content is on disk when this returns.
+    """
+    tmp_path = temp_path(path)
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write_data(f, data)
+            if fsync:
+                f.flush()
+                sync_file(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if fsync:
+        fsync_directory(os.path.dirname(path))
+
+
+class WriteBatch:
+    """Atomic writes whose renames are grouped into one commit
+
+    Files are written and fsynced under temporary names as they come;
+    commit() flushes the drive cache once where the platform needs it
+    (F_FULLFSYNC on macOS), renames them all into place and then fsyncs
+    each directory once, instead of once per file. Used as a context manager it commits on
+    success and discards the temporaries on error.
+    """
+
+    def __init__(self, durability: str = 'batch'):
+        self.durability = durability
+        self.pending: List[Tuple[str, str]] = []
+
+    def write(self, path: str, data: Union[str, Iterable[str]]):
+        """Write data under a temporary name; it appears at path on commit()"""
+        tmp_path = temp_path(path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                write_data(f, data)
+                if self.durability != 'none':
+                    f.flush()
+                    sync_file(f.fileno(), full=False)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.pending.append((tmp_path, path))
+
+    def commit(self):
+        """Rename every pending file into place and fsync their directories"""
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        if self.durability != 'none' and full_sync_supported():
+            # One drive cache flush covers every file fsynced by write()
+            flush_device(pending[0][0])
+        for tmp_path, path in pending:
+            os.replace(tmp_path, path)
+        if self.durability != 'none':
+            for directory in sorted({os.path.dirname(path) for _, path in pending}):
+                fsync_directory(directory)
+
+    def abort(self):
+        """Remove every pending temporary file"""
+        pending, self.pending = self.pending, []
+        for tmp_path, _ in pending:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> 'WriteBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
@@ -4,34 +4,114 @@ Automatic Code Generator and Git Pusher
 Generates random code twice daily and pushes to GitHub repository
 """
 
+import time
+_MODULE_STARTED = time.perf_counter()
+
 import os
+import re
+import sys
+import hashlib
+import itertools
 import random
 import datetime
 import subprocess
 import json
-import time
-from typing import List, Dict
+import argparse
+import contextlib
+from typing import Iterable, Iterator, List, Dict, Tuple, Union
 import logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('auto_generator.log'),
-        logging.StreamHandler()
-    ]
-)
+import metrics
+from atomic_files import DURABILITY_MODES, WriteBatch, write_atomic
+from logging_setup import setup_logging
+from maintenance import DEFAULTS as MAINTENANCE_DEFAULTS, TASKS as MAINTENANCE_TASKS, RepoMaintenance
+from push_queue import PushQueue
+from scheduler import ON_TIME_GRACE, Schedule
+from vcs import create_backend
+from languages import BY_EXTENSION, LanguageRegistry, Language, detect_language, render_random
+from templates import STREAM_TEMPLATES, TEMPLATES
+
 logger = logging.getLogger(__name__)
 
+class StartupProfile:
+    """Named checkpoints of process start-up, for --startup-profile"""
+    
+    def __init__(self, started: float):
+        self.started = started
+        self.marks = []
+    
+    def mark(self, name: str):
+        """Record the end of a start-up phase"""
+        self.marks.append((name, time.perf_counter()))
+    
+    def report(self, run=None) -> str:
+        """Format per-phase and cumulative times, plus the stages of a run"""
+        lines = ["Startup profile (ms):", f"  {'phase':<14} {'self':>9} {'cumulative':>11}"]
+        previous = self.started
+        for name, moment in self.marks:
+            lines.append(f"  {name:<14} {(moment - previous) * 1000:>9.2f} "
+                         f"{(moment - self.started) * 1000:>11.2f}")
+            previous = moment
+        if run is not None and run.stages:
+            lines.append("  run stages:")
+            for stage, result in run.stages.items():
+                lines.append(f"    {stage:<12} {result['seconds'] * 1000:>9.2f}")
+        return '\n'.join(lines)
+
+# First line of the sharded layout's MANIFEST.tsv
+MANIFEST_HEADER = "# timestamp\tlanguage\tpath\n"
+
+# Config keys a running process cannot pick up on reload
+RESTART_KEYS = ('repo_path', 'branch', 'vcs_backend', 'seed', 'state_dir', 'metrics', 'logging')
+
 class AutoCodeGenerator:
-    def __init__(self, config_file: str = 'config.json'):
-        """Initialize the code generator with configuration"""
-        self.config = self.load_config(config_file)
+    def __init__(self, config_file: str = 'config.json', config: Dict = None):
+        """Initialize the code generator from a config file, or an already loaded config
+        
+        A config passed in is used as is; config_file, unless None, is still
+        watched for changes (see reload_config).
+        """
+        started = time.monotonic()
+        self.config_file = config_file
+        self.config_stamp = self.config_file_stamp()
+        self.config = config if config is not None else self.load_config(config_file)
+        self.config_load = (time.monotonic() - started, bool(self.config))
+        # Command-line values that win over the config, also across reloads
+        self.overrides = {}
+        # Settings fixed for the life of the process (RESTART_KEYS)
         self.repo_path = self.config.get('repo_path', '.')
-        self.git_user = self.config.get('git_user')
-        self.git_email = self.config.get('git_email')
-        self.remote_url = self.config.get('remote_url')
+        self.branch = self.config.get('branch', 'main')
+        # How commits are made: 'subprocess' (porcelain), 'plumbing' or 'memory'
+        self.vcs = create_backend(self.config.get('vcs_backend', 'subprocess'), self.repo_path, self.branch)
+        self.seed = self.config.get('seed')
+        self.run_seed = self.seed if self.seed is not None else random.getrandbits(64)
+        self.batches = 0
+        # Everything else is derived by parse_settings and may be reloaded
+        self.__dict__.update(self.parse_settings(self.config))
+        if self.durability not in DURABILITY_MODES:
+            logger.warning(f"Unknown durability {self.durability!r}, using 'batch'")
+            self.durability = 'batch'
+        # Local bookkeeping (scheduler state, caches) lives outside the work tree
+        self.state_dir = self.config.get('state_dir') or os.path.join(self.repo_path, '.git', 'autogen')
+        self.metrics = metrics.from_config(self.config, os.path.join(self.state_dir, 'metrics.json'))
+        self.maintenance = RepoMaintenance(self.repo_path, os.path.join(self.state_dir, 'maintenance.json'),
+                                           self.maintenance_settings)
+        if self.vcs.name == 'memory':
+            self.maintenance.settings['enabled'] = False
+        # Commits not yet pushed, retried with exponential backoff
+        self.push_queue = PushQueue(os.path.join(self.state_dir, 'push_queue.json'),
+                                    [remote['name'] for remote in self.remotes],
+                                    self.push_retry_delay, self.push_retry_max_delay)
+        # Content-hash index, validator and catalog are opened on first use
+        self.dedup = None
+        self.validator = None
+        self.catalog = None
+        self.last_commit = None
+        self.push_queue.on_delivered = self.catalog_delivered
+        self.profile_runs = False
+        # Timestamp source for generated content; backfill swaps in plan dates
+        self.clock = datetime.datetime.now
+        self.last_run = None
         
     def load_config(self, config_file: str) -> Dict:
         """Load configuration from JSON file"""
@@ -42,330 +122,1283 @@ class AutoCodeGenerator:
             logger.error(f"Config file {config_file} not found!")
             return {}
     
+    def config_file_stamp(self) -> Tuple:
+        """(mtime, size, inode) of the config file, or None if it is missing or not watched"""
+        if self.config_file is None:
+            return None
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    def reload_config(self) -> bool:
+        """Swap in the config file if it changed, returning True when it did
+        
+        Costs one stat when nothing changed. The new file is parsed and
+        validated in full before anything is applied; if that fails the
+        error is logged once and the last good config stays in force.
+        """
+        stamp = self.config_file_stamp()
+        if stamp is None or stamp == self.config_stamp:
+            return False
+        self.config_stamp = stamp
+        try:
+            with open(self.config_file, 'r') as f:
+                config = json.load(f)
+            if not isinstance(config, dict):
+                raise ValueError("the top level must be an object")
+            settings = self.parse_settings(config)
+            self.validate_settings(settings)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Ignoring invalid config {self.config_file}, keeping the previous one: {e}")
+            return False
+        self.apply_config(config, settings)
+        logger.info(f"Reloaded config from {self.config_file}")
+        return True
+    
+    @staticmethod
+    def validate_settings(settings: Dict):
+        """Reject settings a reload must not apply, raising ValueError"""
+        if settings['durability'] not in DURABILITY_MODES:
+            raise ValueError(f"unknown durability {settings['durability']!r}")
+        if settings['layout_mode'] not in ('flat', 'sharded'):
+            raise ValueError(f"unknown layout mode {settings['layout_mode']!r}")
+        if not settings['schedule'].expressions:
+            raise ValueError("the schedule has no valid trigger times")
+    
+    def apply_config(self, config: Dict, settings: Dict):
+        """Swap in a parsed config between runs
+        
+        All derived settings are replaced in a single attribute update;
+        helpers whose settings changed are closed and reopened on next use.
+        """
+        restart = [key for key in RESTART_KEYS if config.get(key) != self.config.get(key)]
+        if restart:
+            logger.warning(f"Config changes to {', '.join(restart)} take effect after a restart")
+        if settings['dedup_settings'] != self.dedup_settings and self.dedup is not None:
+            self.dedup.close()
+            self.dedup = None
+        if settings['validation_settings'] != self.validation_settings and self.validator is not None:
+            self.validator.save()
+            self.validator = None
+        if settings['catalog_settings'] != self.catalog_settings and self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
+        
+        self.__dict__.update(settings, config=config)
+        self.push_queue.set_remotes([remote['name'] for remote in self.remotes])
+        self.push_queue.base_delay = self.push_retry_delay
+        self.push_queue.max_delay = self.push_retry_max_delay
+        self.maintenance.settings = {**MAINTENANCE_DEFAULTS, **(self.maintenance_settings or {})}
+        if self.vcs.name == 'memory':
+            self.maintenance.settings['enabled'] = False
+    
+    def override(self, **values):
+        """Set command-line values that take precedence over the config, now and after reloads"""
+        values = {name: value for name, value in values.items() if value is not None}
+        self.overrides.update(values)
+        self.__dict__.update(values)
+    
+    def parse_settings(self, config: Dict) -> Dict:
+        """Derive every reloadable setting from a config, as attribute values
+        
+        Raises ValueError or TypeError for values of the wrong type.
+        """
+        layout = config.get('layout', {})
+        # Large files: when target_size is set, every file is streamed to about that many bytes
+        streaming = config.get('streaming', {})
+        settings = {
+            'git_user': config.get('git_user'),
+            'git_email': config.get('git_email'),
+            'remote_url': config.get('remote_url'),
+            'burst_count': max(1, int(config.get('burst_count', 1))),
+            'push_timeout': float(config.get('push_timeout', 120)),
+            'push_concurrency': max(1, int(config.get('push_concurrency', 1))),
+            'push_retry_delay': float(config.get('push_retry_delay', 30)),
+            'push_retry_max_delay': float(config.get('push_retry_max_delay', 3600)),
+            'remotes': self.remotes_from_config(config),
+            # Parallel rendering: worker processes
+            'workers': max(1, int(config.get('workers', 1))),
+            'schedule': Schedule.from_config(config.get('schedule')),
+            'languages': LanguageRegistry.from_config(config.get('file_types')),
+            # Output layout: 'flat' (repo root) or 'sharded' (root/pattern/ directories)
+            'layout_mode': layout.get('mode', 'flat'),
+            'layout_root': layout.get('root', 'generated'),
+            'layout_pattern': layout.get('pattern', '{year}/{month}/{language}'),
+            # How generated files reach the disk: 'none', 'batch' (one flush per burst) or 'always'
+            'durability': config.get('durability', 'batch'),
+            'stream_target_size': max(0, int(streaming.get('target_size', 0))),
+            'stream_chunk_size': max(1024, int(streaming.get('chunk_size', 64 * 1024))),
+            'maintenance_settings': config.get('maintenance'),
+            'dedup_settings': {'enabled': True, 'capacity': 1_000_000, 'error_rate': 0.001,
+                               'max_attempts': 5, **config.get('dedup', {})},
+            # Syntax/compile checks of generated code
+            'validation_settings': {'enabled': True, 'max_attempts': 50, 'workers': 4, 'timeout': 30,
+                                    **config.get('validation', {})},
+            # SQLite catalog of runs and generated files
+            'catalog_settings': {'enabled': True, **config.get('catalog', {})},
+            # Profiling: forced for every run by --profile, or sampled every Nth run
+            'profile_settings': {'every': 0, 'dir': None, 'interval': 0.005, 'top': 25,
+                                 **config.get('profiling', {})},
+            # Seconds between checks of the config file while the scheduler sleeps
+            'config_reload_interval': max(0.1, float(config.get('config_reload_interval', 5))),
+        }
+        settings.update(self.overrides)
+        return settings
+    
+    def remotes_from_config(self, config: Dict = None) -> List[Dict]:
+        """Push targets from `remotes`, or origin when only `remote_url` is set
+        
+        Each target has a name, an optional url (pushed to directly instead
+        of the named git remote), a branch and a push timeout.
+        """
+        config = self.config if config is None else config
+        push_timeout = float(config.get('push_timeout', 120))
+        entries = config.get('remotes')
+        if entries is None:
+            entries = [{'name': 'origin'}] if config.get('remote_url') else []
+        remotes = []
+        for entry in entries:
+            name = entry.get('name') or entry.get('url')
+            if not name:
+                logger.warning(f"Ignoring remote without name or url: {entry}")
+                continue
+            if any(remote['name'] == name for remote in remotes):
+                logger.warning(f"Ignoring duplicate remote: {name}")
+                continue
+            remotes.append({
+                'name': name,
+                'url': entry.get('url'),
+                'branch': entry.get('branch', self.branch),
+                'timeout': float(entry.get('timeout', push_timeout)),
+            })
+        return remotes
+    
     def generate_random_code(self) -> str:
-        """Generate random code in various programming languages"""
-        languages = [
-            self.generate_python_code,
-            self.generate_javascript_code,
-            self.generate_cpp_code,
-            self.generate_java_code,
-            self.generate_html_code
-        ]
-        
-        generator = random.choice(languages)
+        """Generate random code in a language drawn by the file_types weights"""
+        language = self.languages.sample(random)
+        generator = getattr(self, f"generate_{language.name}_code")
         return generator()
     
+    def generate_random_codes(self, count: int) -> List[Tuple[Language, str]]:
+        """Generate count random (language, code) pairs, one template batch per language
+        
+        With a `seed` or more than one worker, the batch is rendered in
+        seeded chunks (see parallel_gen) so the output is reproducible.
+        """
+        if self.seed is None and self.workers == 1:
+            return render_random(count, random, self.clock(), self.languages)
+        from parallel_gen import chunk_tasks, iter_rendered
+        self.batches += 1
+        tasks = chunk_tasks(self.run_seed, self.batches, count, self.clock(), self.languages.weights)
+        return [pair for chunk in iter_rendered(tasks, self.workers) for pair in chunk]
+    
+    def generate_streams(self, count: int) -> List[Tuple[Language, Iterator[str]]]:
+        """Draw count languages, each with a lazy chunk iterator of a large file
+        
+        Files are about stream_target_size characters; nothing is rendered
+        until the chunks are consumed, one file at a time.
+        """
+        rng = random if self.seed is None else random.Random(f"stream:{self.run_seed}:{self.batches}")
+        self.batches += 1
+        now = self.clock()
+        return [(language, STREAM_TEMPLATES[language.name].iter_render(
+                    self.stream_target_size, rng, now, self.stream_chunk_size))
+                for language in self.languages.sample_many(count, rng)]
+    
+    def iter_planned_codes(self, plan, count: int):
+        """Yield (when, [(language, code), ...]) for every planned commit time"""
+        if self.seed is None and self.workers == 1:
+            for when in plan:
+                yield when, render_random(count, random, when, self.languages)
+            return
+        from parallel_gen import derive_seed, iter_rendered
+        plan = list(plan)
+        tasks = [(derive_seed(self.run_seed, 'plan', index), count, when, self.languages.weights)
+                 for index, when in enumerate(plan)]
+        yield from zip(plan, iter_rendered(tasks, self.workers))
+    
+    def dedup_index(self):
+        """Open the dedup index on first use, or return None when disabled"""
+        if not self.dedup_settings['enabled']:
+            return None
+        if self.dedup is None:
+            try:
+                from dedup import DedupIndex
+                self.dedup = DedupIndex(self.state_path('dedup.bloom'),
+                                        int(self.dedup_settings['capacity']),
+                                        float(self.dedup_settings['error_rate']))
+            except (OSError, ValueError) as e:
+                logger.error(f"Dedup index unavailable, not deduplicating: {e}")
+                self.dedup_settings['enabled'] = False
+                return None
+        return self.dedup
+    
+    def dedup_codes(self, codes: List[Tuple[Language, str]],
+                    now: datetime.datetime = None) -> List[Tuple[Language, str]]:
+        """Regenerate files whose content (ignoring timestamps) was generated before
+        
+        A duplicate is re-rendered in the same language up to
+        dedup.max_attempts times, then kept with a warning. Seeded runs only
+        record their files: re-rendering would make their content depend on
+        the index left by earlier runs, not just on the seed.
+        """
+        index = self.dedup_index()
+        if index is None:
+            return codes
+        if self.seed is not None:
+            for _, code in codes:
+                index.add(code)
+            index.flush()
+            return codes
+        rng = random
+        max_attempts = int(self.dedup_settings['max_attempts'])
+        unique = []
+        regenerated = kept = 0
+        for language, code in codes:
+            attempts = 0
+            duplicate = not index.add(code)
+            while duplicate and attempts < max_attempts:
+                attempts += 1
+                code = language.template.render(rng, now or self.clock())
+                duplicate = not index.add(code)
+            regenerated += attempts > 0
+            kept += duplicate
+            unique.append((language, code))
+        index.flush()
+        if regenerated:
+            logger.info(f"Regenerated {regenerated} duplicate file(s)")
+        if kept:
+            logger.warning(f"Kept {kept} duplicate file(s) after {max_attempts} attempts each")
+        return unique
+    
+    def code_validator(self):
+        """Set up the validator on first use, or return None when disabled"""
+        if not self.validation_settings['enabled']:
+            return None
+        if self.validator is None:
+            from validation import CodeValidator
+            self.validator = CodeValidator(os.path.join(self.state_dir, 'validation.json'),
+                                           int(self.validation_settings['workers']),
+                                           float(self.validation_settings['timeout']))
+        return self.validator
+    
+    def validate_codes(self, codes: List[Tuple[Language, str]],
+                       now: datetime.datetime = None) -> List[Tuple[Language, str]]:
+        """Replace files that fail to parse or compile
+        
+        An invalid file is re-rendered in the same language until it is
+        valid (and, with dedup on and no seed, new) or
+        validation.max_attempts is reached; files still invalid then are
+        dropped. Once every shape of a language is known to be invalid,
+        its files are kept unvalidated, with a single warning.
+        """
+        validator = self.code_validator()
+        if validator is None:
+            return codes
+        index = self.dedup_index()
+        rng = random if self.seed is None else random.Random(f"validate:{self.run_seed}:{self.batches}:{now}")
+        max_attempts = int(self.validation_settings['max_attempts'])
+        valid = []
+        regenerated = 0
+        failures = {}
+        for (language, code), (ok, detail) in zip(codes, validator.validate(codes)):
+            attempts = 0
+            while not ok and attempts < max_attempts and not validator.exhausted(language):
+                attempts += 1
+                code = language.template.render(rng, now or self.clock())
+                ok, detail = validator.check(language, code)
+                # Seeded runs record replacements without rejecting duplicates (see dedup_codes)
+                if ok and index is not None and not index.add(code) and self.seed is None:
+                    ok, detail = False, 'duplicate'
+            regenerated += attempts > 0
+            if not ok and validator.exhausted(language):
+                if language.name not in validator.abandoned:
+                    validator.abandoned.add(language.name)
+                    logger.warning(f"No {language.name} template variant passes validation ({detail}), "
+                                   f"writing {language.name} files unvalidated")
+                ok = True
+            if ok:
+                valid.append((language, code))
+            else:
+                failures.setdefault(language.name, detail)
+        validator.save()
+        if index is not None and regenerated:
+            index.flush()
+        if regenerated:
+            logger.info(f"Regenerated {regenerated} invalid file(s)")
+        for name, detail in failures.items():
+            logger.warning(f"Dropped invalid {name} file(s) after {max_attempts} attempts: {detail}")
+        return valid
+    
+    def rebuild_dedup_index(self) -> int:
+        """Rebuild the dedup index from the generated files in the work tree
+        
+        Returns the number of files indexed.
+        """
+        listing = self._git_output('ls-files', '-z')
+        paths = [path for path in (listing or '').split('\0')
+                 if os.path.basename(path).startswith('auto_generated_')
+                 and os.path.splitext(path)[1] in BY_EXTENSION]
+        
+        def read_codes():
+            for path in paths:
+                try:
+                    with open(os.path.join(self.repo_path, path), 'r', encoding='utf-8') as f:
+                        yield f.read()
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Skipping {path}: {e}")
+        
+        # Leave headroom so the rebuilt filter is not full on day one
+        capacity = max(int(self.dedup_settings['capacity']), 2 * len(paths))
+        if self.dedup is not None:
+            self.dedup.close()
+        from dedup import DedupIndex
+        self.dedup = DedupIndex.rebuild(self.state_path('dedup.bloom'), read_codes(), capacity,
+                                        float(self.dedup_settings['error_rate']))
+        logger.info(f"Dedup index rebuilt from {len(paths)} files "
+                    f"({self.dedup.count} distinct, capacity {capacity})")
+        return len(paths)
+    
     def generate_python_code(self) -> str:
         """Generate random Python code"""
-        functions = [
-            "def calculate_fibonacci(n):",
-            "def binary_search(arr, target):",
-            "def bubble_sort(data):",
-            "def merge_sort(arr):",
-            "def quick_sort(arr):",
-            "def factorial(n):",
-            "def is_prime(num):",
-            "def reverse_string(text):",
-            "def count_vowels(text):",
-            "def find_max(arr):"
-        ]
-        
-        function = random.choice(functions)
-        code = f"""#!/usr/bin/env python3
-# Auto-generated code at {datetime.datetime.now()}
-
-{function}
-    \"\"\"Auto-generated function\"\"\"
-    # Random implementation
-    result = {random.randint(1, 100)}
-    for i in range({random.randint(1, 10)}):
-        result += {random.randint(1, 50)}
-    return result
-
-# Test the function
-if __name__ == "__main__":
-    test_result = {function.split()[1].split('(')[0]}({random.randint(1, 20)})
-    print(f"Result: {{test_result}}")
-"""
-        return code
+        return TEMPLATES['python'].render(random, self.clock())
     
     def generate_javascript_code(self) -> str:
         """Generate random JavaScript code"""
-        functions = [
-            "function calculateSum(a, b)",
-            "function findAverage(numbers)",
-            "function reverseArray(arr)",
-            "function capitalizeWords(str)",
-            "function countOccurrences(arr, target)",
-            "function generateRandomString(length)",
-            "function validateEmail(email)",
-            "function shuffleArray(arr)",
-            "function findLongestWord(str)",
-            "function isPalindrome(str)"
-        ]
-        
-        function = random.choice(functions)
-        code = f"""// Auto-generated JavaScript code at {datetime.datetime.now()}
-
-{function} {{
-    // Auto-generated function
-    const randomNumber = {random.randint(1, 100)};
-    const multiplier = {random.randint(1, 10)};
-    
-    return randomNumber * multiplier;
-}}
-
-// Test the function
-console.log("Auto-generated result:", {function.split()[1].split('(')[0]}({random.randint(1, 20)}));
-"""
-        return code
+        return TEMPLATES['javascript'].render(random, self.clock())
     
     def generate_cpp_code(self) -> str:
         """Generate random C++ code"""
-        functions = [
-            "int calculatePower(int base, int exponent)",
-            "int findGCD(int a, int b)",
-            "bool isEven(int number)",
-            "int sumArray(int arr[], int size)",
-            "int findMax(int arr[], int size)",
-            "void printPattern(int n)",
-            "int factorial(int n)",
-            "bool isPalindrome(int num)",
-            "int countDigits(int num)",
-            "int reverseNumber(int num)"
-        ]
-        
-        function = random.choice(functions)
-        code = f"""// Auto-generated C++ code at {datetime.datetime.now()}
-#include <iostream>
-#include <vector>
-#include <algorithm>
-
-{function} {{
-    // Auto-generated function
-    int result = {random.randint(1, 100)};
-    for (int i = 0; i < {random.randint(1, 10)}; i++) {{
-        result += {random.randint(1, 50)};
-    }}
-    return result;
-}}
-
-int main() {{
-    // Test the function
-    auto result = {function.split()[1].split('(')[0]}({random.randint(1, 20)});
-    std::cout << "Auto-generated result: " << result << std::endl;
-    return 0;
-}}
-"""
-        return code
+        return TEMPLATES['cpp'].render(random, self.clock())
     
     def generate_java_code(self) -> str:
         """Generate random Java code"""
-        classes = [
-            "Calculator",
-            "StringProcessor",
-            "NumberUtils",
-            "ArrayHelper",
-            "MathOperations",
-            "DataValidator",
-            "TextAnalyzer",
-            "RandomGenerator",
-            "SortingUtils",
-            "SearchAlgorithms"
-        ]
-        
-        class_name = random.choice(classes)
-        methods = [
-            "public int processData(int input)",
-            "public String manipulateText(String text)",
-            "public boolean validateInput(String input)",
-            "public int calculateResult(int a, int b)",
-            "public void printResults()"
-        ]
-        
-        method = random.choice(methods)
-        code = f"""// Auto-generated Java code at {datetime.datetime.now()}
-public class {class_name} {{
-    
-    {method} {{
-        // Auto-generated method
-        int result = {random.randint(1, 100)};
-        for (int i = 0; i < {random.randint(1, 10)}; i++) {{
-            result += {random.randint(1, 50)};
-        }}
-        return result;
-    }}
-    
-    public static void main(String[] args) {{
-        {class_name} instance = new {class_name}();
-        System.out.println("Auto-generated result: " + 
-                          instance.{method.split()[1].split('(')[0]}({random.randint(1, 20)}));
-    }}
-}}
-"""
-        return code
+        return TEMPLATES['java'].render(random, self.clock())
     
     def generate_html_code(self) -> str:
         """Generate random HTML code"""
-        colors = ['red', 'blue', 'green', 'purple', 'orange', 'pink', 'yellow', 'teal']
-        color = random.choice(colors)
-        
-        code = f"""<!DOCTYPE html>
-<!-- Auto-generated HTML at {datetime.datetime.now()} -->
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Auto-Generated Page</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background-color: {color};
-            margin: 0;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: {color};
-            text-align: center;
-        }}
-        .random-number {{
-            font-size: 24px;
-            font-weight: bold;
-            text-align: center;
-            margin: 20px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Auto-Generated HTML Page</h1>
-        <p>This page was automatically generated at {datetime.datetime.now()}.</p>
-        <div class="random-number">Random Number: {random.randint(1, 1000)}</div>
-        <p>Generated with love by the Auto Code Generator!</p>
-    </div>
-</body>
-</html>"""
-        return code
-    
-    def save_code_to_file(self, code: str, filename: str = None) -> str:
-        """Save generated code to a file"""
-        if not filename:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            extensions = ['.py', '.js', '.cpp', '.java', '.html']
-            ext = random.choice(extensions)
+        return TEMPLATES['html'].render(random, self.clock())
+    
+    def make_filename(self, timestamp: str = None, index: int = None, width: int = 3,
+                      extension: str = None) -> str:
+        """Build a generated file name, numbered when several share a timestamp"""
+        if not timestamp:
+            timestamp = self.clock().strftime("%Y%m%d_%H%M%S")
+        ext = extension or self.languages.sample(random).extension
+        if index is None:
             filename = f"auto_generated_{timestamp}{ext}"
+        else:
+            filename = f"auto_generated_{timestamp}_{index:0{width}d}{ext}"
+        if self.layout_mode == 'sharded':
+            return f"{self.shard_dir(timestamp, ext)}/{filename}"
+        return filename
+    
+    def shard_dir(self, timestamp: str, extension: str) -> str:
+        """Repo-relative directory of a generated file in the sharded layout"""
+        language = BY_EXTENSION.get(extension)
+        shard = self.layout_pattern.format(
+            year=timestamp[:4], month=timestamp[4:6], day=timestamp[6:8],
+            language=language.name if language else extension.lstrip('.'))
+        return f"{self.layout_root}/{shard}"
+    
+    def manifest_path(self) -> str:
+        """Path of the manifest listing every file of the sharded layout"""
+        return os.path.join(self.repo_path, self.layout_root, 'MANIFEST.tsv')
+    
+    def manifest_lines(self, entries: List[Tuple[str, str, str]]) -> str:
+        """Format (timestamp, language, path) manifest entries"""
+        return ''.join(f"{timestamp}\t{language}\t{path}\n" for timestamp, language, path in entries)
+    
+    def append_manifest(self, entries: List[Tuple[str, str, str]]) -> str:
+        """Append entries to the manifest, returning its path"""
+        path = self.manifest_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            is_new = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8') as f:
+                if is_new:
+                    f.write(MANIFEST_HEADER)
+                f.write(self.manifest_lines(entries))
+            return path
+        except OSError as e:
+            logger.error(f"Error updating manifest {path}: {e}")
+            return None
+    
+    def unique_filename(self, timestamp: str = None, index: int = None, width: int = 3,
+                        extension: str = None) -> str:
+        """Like make_filename, but never returns the name of an existing file"""
+        filename = self.make_filename(timestamp, index, width, extension)
+        base, ext = os.path.splitext(filename)
+        suffix = 1
+        while os.path.exists(os.path.join(self.repo_path, filename)):
+            filename = f"{base}_{suffix}{ext}"
+            suffix += 1
+        return filename
+    
+    def save_code_to_file(self, code: Union[str, Iterable[str]], filename: str = None,
+                          batch: WriteBatch = None) -> str:
+        """Save generated code to a file, named after its language when no filename is given
+        
+        code is a string or an iterable of chunks, written one at a time.
+        The file is written under a temporary name and renamed into place.
+        Given a batch, it only appears once the batch is committed.
+        """
+        if not filename:
+            head = code
+            if not isinstance(code, str):
+                chunks = iter(code)
+                head = next(chunks, '')
+                code = itertools.chain([head], chunks)
+            language = detect_language(head)
+            filename = self.unique_filename(extension=language.extension if language else None)
         
         filepath = os.path.join(self.repo_path, filename)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(code)
+            os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+            if batch is not None:
+                batch.write(filepath, code)
+            else:
+                write_atomic(filepath, code, fsync=self.durability != 'none')
             logger.info(f"Code saved to {filepath}")
             return filepath
         except Exception as e:
             logger.error(f"Error saving code to {filepath}: {e}")
             return None
     
-    def setup_git_config(self):
-        """Setup Git configuration if not already set"""
+    def git_identity_key(self) -> Dict:
+        """Identity to apply plus the state of .git/config, or None if unknown"""
         try:
-            if self.git_user:
-                subprocess.run(['git', 'config', 'user.name', self.git_user], 
-                             cwd=self.repo_path, check=True)
-            if self.git_email:
-                subprocess.run(['git', 'config', 'user.email', self.git_email], 
-                             cwd=self.repo_path, check=True)
-            logger.info("Git configuration updated")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error setting up git config: {e}")
+            stat = os.stat(os.path.join(self.repo_path, '.git', 'config'))
+        except OSError:
+            return None
+        return {
+            'repo_path': os.path.abspath(self.repo_path),
+            'git_user': self.git_user,
+            'git_email': self.git_email,
+            'git_config_mtime_ns': stat.st_mtime_ns,
+            'git_config_size': stat.st_size,
+        }
     
-    def git_add_commit_push(self, filepath: str):
-        """Add, commit, and push the generated code to GitHub"""
-        try:
-            # Add file to git
-            subprocess.run(['git', 'add', filepath], cwd=self.repo_path, check=True)
-            
-            # Commit with timestamp
+    def setup_git_config(self) -> bool:
+        """Setup Git configuration if not already set
+        
+        The applied identity is cached together with the stat of .git/config,
+        so unchanged runs skip the `git config` subprocesses entirely.
+        """
+        key = self.git_identity_key()
+        if key is not None and self.load_state('git_identity.json') == key:
+            logger.debug("Git identity unchanged, skipping git config")
+            return True
+        if not self.vcs.configure_identity(self.git_user, self.git_email):
+            return False
+        logger.info("Git configuration updated")
+        key = self.git_identity_key()
+        if key is not None:
+            self.save_state('git_identity.json', key)
+        return True
+    
+    def git_add(self, filepaths: List[str], include_removals: bool = False) -> bool:
+        """Stage files in one batch through the VCS backend
+        
+        With include_removals, paths that no longer exist are staged as deletions.
+        """
+        return self.vcs.add([os.path.relpath(path, self.repo_path) for path in filepaths], include_removals)
+    
+    def git_commit(self, file_count: int = 1, commit_message: str = None) -> bool:
+        """Commit the staged files, by default with a timestamped message"""
+        if not commit_message:
             timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            commit_message = f"Auto-generated code at {timestamp}"
-            subprocess.run(['git', 'commit', '-m', commit_message], 
-                         cwd=self.repo_path, check=True)
-            
-            # Push to remote
-            if self.remote_url:
-                subprocess.run(['git', 'push', 'origin', 'main'], 
-                             cwd=self.repo_path, check=True)
-                logger.info(f"Successfully pushed {filepath} to GitHub")
+            if file_count == 1:
+                commit_message = f"Auto-generated code at {timestamp}"
             else:
-                logger.warning("No remote URL configured, commit made locally only")
-                
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error in git operations: {e}")
+                commit_message = f"Auto-generated {file_count} files at {timestamp}"
+        return self.vcs.commit(commit_message)
+    
+    def push_command(self, remote: Dict) -> List[str]:
+        """The command line pushing the branch to one remote, or None if the backend pushes in-process"""
+        return self.vcs.push_command(remote)
+    
+    def push_remote(self, remote: Dict) -> Tuple[bool, str]:
+        """Push the branch to one remote within its timeout, returning (ok, detail)"""
+        return self.vcs.push(remote)
+    
+    def push_remotes(self, names: List[str], run: metrics.RunRecord = None) -> Dict[str, Tuple[bool, str]]:
+        """Push to the named remotes concurrently, one thread each
+        
+        Each remote is bounded by its own timeout, so a slow mirror never
+        holds up the others. Results are logged and, given a run, recorded
+        as `push.<name>` stages.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        remotes = [remote for remote in self.remotes if remote['name'] in names]
+        results = {}
+        if not remotes:
+            return results
+        
+        def timed_push(remote):
+            started = time.monotonic()
+            ok, detail = self.push_remote(remote)
+            return ok, detail, time.monotonic() - started
+        
+        with ThreadPoolExecutor(max_workers=len(remotes)) as pool:
+            futures = {remote['name']: pool.submit(timed_push, remote) for remote in remotes}
+            for name, future in futures.items():
+                ok, detail, seconds = future.result()
+                results[name] = (ok, detail)
+                if run is not None:
+                    run.record(f"push.{name}", seconds, ok)
+                if ok:
+                    logger.info(f"Successfully pushed {self.branch} to {name} in {seconds:.2f}s")
+                else:
+                    logger.error(f"Error pushing to {name}: {detail}")
+        return results
+    
+    def git_push(self) -> bool:
+        """Push the branch to every configured remote"""
+        if not self.remotes:
+            logger.warning("No remote URL configured, commit made locally only")
+            return False
+        results = self.push_remotes([remote['name'] for remote in self.remotes])
+        return all(ok for ok, _ in results.values())
+    
+    def git_add_commit(self, filepaths: Union[str, List[str]]) -> bool:
+        """Add and commit files locally and queue the commit for pushing"""
+        if isinstance(filepaths, str):
+            filepaths = [filepaths]
+        if not filepaths:
+            logger.warning("No files to commit")
+            return False
+        return self.git_add(filepaths) and self.git_commit(len(filepaths)) and self.queue_head()
+    
+    def git_add_commit_push(self, filepaths: Union[str, List[str]]) -> bool:
+        """Add, commit, and push the generated code to GitHub
+        
+        Accepts a single path or a whole burst of paths; either way the files
+        are staged with one `git add`, recorded in one commit and sent with
+        one push. A failed push leaves the commit in the push queue.
+        """
+        try:
+            return self.git_add_commit(filepaths) and self.flush_push_queue(force=True)
         except Exception as e:
             logger.error(f"Unexpected error during git operations: {e}")
+            return False
+    
+    def queue_head(self) -> bool:
+        """Record the commit at HEAD in the push queue"""
+        sha = self.vcs.head()
+        if not sha:
+            logger.error("Could not resolve HEAD to queue it for pushing")
+            return False
+        self.last_commit = sha
+        self.push_queue.enqueue(sha)
+        return True
     
-    def generate_and_push(self):
-        """Main method to generate code and push to GitHub"""
-        logger.info("Starting code generation and push process...")
+    def flush_push_queue(self, force: bool = False, run: metrics.RunRecord = None) -> bool:
+        """Push every queued commit, one concurrent push per remote
         
-        # Setup git config
-        self.setup_git_config()
+        Without force, remotes still backing off after a failure are skipped.
+        """
+        if not self.remotes:
+            logger.warning("No remote URL configured, commit made locally only")
+            return False
+        return self.push_queue.flush(lambda names: self.push_remotes(names, run), force)
+    
+    def export_queue_gauges(self):
+        """Expose the push backlog as metrics gauges"""
+        self.metrics.set_gauge('push_queue_depth', self.push_queue.depth(),
+                               "Commits waiting to be pushed")
+        self.metrics.set_gauge('push_queue_oldest_age_seconds', round(self.push_queue.oldest_age(), 1),
+                               "Age of the oldest commit waiting to be pushed")
+    
+    def open_catalog(self):
+        """Open the catalog on first use, or return None when disabled"""
+        if not self.catalog_settings['enabled']:
+            return None
+        if self.catalog is None:
+            from catalog import Catalog
+            path = self.catalog_settings.get('path') or self.state_path('catalog.sqlite3')
+            try:
+                self.catalog = Catalog(path)
+            except Exception as e:
+                logger.error(f"Catalog unavailable at {path}: {e}")
+                self.catalog_settings['enabled'] = False
+                return None
+        return self.catalog
+    
+    def catalog_run(self, run: metrics.RunRecord, status: str):
+        """Record a finished run and its files in the catalog"""
+        catalog = self.open_catalog()
+        if catalog is None:
+            return
+        try:
+            catalog.record_run(run.started, status, run.commit, run.stages, run.artifacts)
+        except Exception as e:
+            logger.error(f"Error recording run in catalog: {e}")
+    
+    def catalog_delivered(self, commit_shas: List[str]):
+        """Mark runs as pushed once every remote has their commits"""
+        catalog = self.open_catalog()
+        if catalog is None:
+            return
+        try:
+            catalog.mark_pushed(commit_shas)
+        except Exception as e:
+            logger.error(f"Error updating push status in catalog: {e}")
+    
+    def print_stats(self, since: datetime.date = None, until: datetime.date = None,
+                    language: str = None, unpushed: bool = False):
+        """Print run outcomes and file counts from the catalog"""
+        catalog = self.open_catalog()
+        if catalog is None:
+            print("Catalog is disabled")
+            return
+        stats = catalog.stats(since, until, language)
+        print("Runs by status:")
+        for status, count in stats['runs'].items():
+            print(f"  {status:<14} {count:>8}")
+        print(f"  {'total':<14} {sum(stats['runs'].values()):>8}")
+        print("Files by language:")
+        for name, count in stats['files'].items():
+            print(f"  {name:<14} {count:>8}")
+        print(f"  {'total':<14} {sum(stats['files'].values()):>8}")
+        if unpushed:
+            print("Runs not pushed to every remote:")
+            for started, status, sha, file_count in catalog.unpushed_runs(since, until):
+                print(f"  {started}  {status:<12} {(sha or '-')[:12]:<12} {file_count:>5} file(s)")
+    
+    def new_run(self) -> metrics.RunRecord:
+        """Start a metrics record, charging it with the pending config load"""
+        run = self.metrics.new_run()
+        if self.config_load:
+            run.record('config_load', *self.config_load)
+            self.config_load = None
+        return run
+    
+    def generate_files(self, count: int = None, run: metrics.RunRecord = None) -> List[str]:
+        """Generate and save a burst of files, returning the saved paths"""
+        if count is None:
+            count = self.burst_count
+        run = run or self.metrics.new_run()
+        # Streamed files are rendered while they are written, so they skip dedup and validation
+        streaming = self.stream_target_size > 0
+        if streaming:
+            codes = run.time('generate', self.generate_streams, count)
+        else:
+            codes = run.time('generate', self.generate_random_codes, count)
+            codes = run.time('dedup', self.dedup_codes, codes)
+            codes = run.time('validate', self.validate_codes, codes)
         
-        # Generate random code
-        code = self.generate_random_code()
+        started = time.monotonic()
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        width = max(3, len(str(count - 1)))
+        generated_at = datetime.datetime.now().isoformat(timespec='seconds')
+        from dedup import hash_chunks, normalized_hash
+        filepaths = []
+        entries = []
+        artifacts = []
+        # In batch mode the burst is renamed together, with one fsync per directory
+        batch = WriteBatch(self.durability) if self.durability == 'batch' else None
+        for index, (language, code) in enumerate(codes):
+            filename = self.unique_filename(timestamp, index if count > 1 else None, width,
+                                            language.extension)
+            digest = None
+            if streaming and self.catalog_settings['enabled']:
+                digest = hashlib.blake2b(digest_size=16)
+                code = hash_chunks(code, digest)
+            filepath = self.save_code_to_file(code, filename, batch)
+            if filepath:
+                filepaths.append(filepath)
+                entries.append((generated_at, language.name, filename))
+                if self.catalog_settings['enabled']:
+                    if digest is not None:
+                        signature, content_hash = STREAM_TEMPLATES[language.name].signature, digest.hexdigest()
+                    else:
+                        signature, content_hash = language.template.signature, normalized_hash(code).hex()
+                    artifacts.append((generated_at, language.name, signature, content_hash, filename))
+        if batch is not None:
+            try:
+                batch.commit()
+            except OSError as e:
+                logger.error(f"Error committing {len(filepaths)} file(s) to disk: {e}")
+                batch.abort()
+                filepaths, entries, artifacts = [], [], []
+        run.artifacts.extend(artifacts)
+        if entries and self.layout_mode == 'sharded':
+            self.append_manifest(entries)
+        # Files dropped by validation are not write failures
+        run.record('write', time.monotonic() - started, len(filepaths) == len(codes))
         
-        # Save to file
-        filepath = self.save_code_to_file(code)
-        if not filepath:
+        if filepaths and len(filepaths) < len(codes):
+            logger.warning(f"Only {len(filepaths)} of {len(codes)} files were saved")
+        return filepaths
+    
+    def generate_and_commit(self, count: int = None, run: metrics.RunRecord = None) -> bool:
+        """Generate a burst of files and commit them locally"""
+        if count is None:
+            count = self.burst_count
+        run = run or self.metrics.new_run()
+        logger.info(f"Starting code generation process ({count} file(s))...")
+        
+        # Setup git config
+        run.time('git_config', self.setup_git_config)
+        
+        # Generate and save every file of the burst before touching git
+        filepaths = self.generate_files(count, run)
+        if not filepaths:
             logger.error("Failed to save code to file")
-            return
+            return False
         
-        # Git operations
-        self.git_add_commit_push(filepath)
+        staged = list(filepaths)
+        if self.layout_mode == 'sharded' and os.path.exists(self.manifest_path()):
+            staged.append(self.manifest_path())
+        try:
+            committed = (run.time('add', self.git_add, staged)
+                         and run.time('commit', self.git_commit, len(filepaths))
+                         and self.queue_head())
+            if committed:
+                run.commit = self.last_commit
+            return committed
+        except Exception as e:
+            logger.error(f"Unexpected error during git operations: {e}")
+            return False
+    
+    def generate_and_push(self, count: int = None):
+        """Main method to generate code and push to GitHub
+        
+        In burst mode (count > 1) all files of the trigger land in one commit.
+        """
+        with self.run_profiler():
+            run = self.new_run()
+            status = 'failed'
+            if self.generate_and_commit(count, run):
+                status = 'committed'
+                if self.remotes:
+                    # A trigger always tries to push, backoff or not; the queued
+                    # backlog goes out with it
+                    ok = run.time('push', self.flush_push_queue, True, run)
+                    status = 'pushed' if ok else 'push_failed'
+                else:
+                    logger.warning("No remote URL configured, commit made locally only")
+                self.track_repo_objects()
+            self.export_queue_gauges()
+            self.metrics.finish(run, status=status)
+            self.catalog_run(run, status)
+            self.last_run = run
         
         logger.info("Code generation and push process completed!")
     
+    def profile_due(self) -> bool:
+        """Whether the next run is profiled: always with --profile, else every Nth run
+        
+        The run count is kept in the state directory so sampling also works
+        across --once invocations.
+        """
+        if self.profile_runs:
+            return True
+        every = int(self.profile_settings['every'])
+        if every <= 0:
+            return False
+        runs = self.load_state('profiling.json').get('runs', 0) + 1
+        self.save_state('profiling.json', {'runs': runs})
+        return runs % every == 0
+    
+    def run_profiler(self):
+        """A profiler context for the next run, or a no-op one when it is not profiled"""
+        if not self.profile_due():
+            return contextlib.nullcontext()
+        from profiling import RunProfiler
+        log_file = self.config.get('logging', {}).get('file') or 'auto_generator.log'
+        output_dir = self.profile_settings['dir'] or os.path.join(os.path.dirname(log_file), 'profiles')
+        name = os.path.basename(os.path.abspath(self.repo_path))
+        return RunProfiler(output_dir, f"profile-{name}", float(self.profile_settings['interval']),
+                           int(self.profile_settings['top']))
+    
+    def track_repo_objects(self, new_run: bool = True):
+        """Count loose objects and packs after a run and export them as gauges"""
+        stats = self.maintenance.record_run(new_run)
+        if stats:
+            self.metrics.set_gauge('repo_loose_objects', stats.get('count', 0),
+                                   "Loose objects in the repository")
+            self.metrics.set_gauge('repo_packs', stats.get('packs', 0),
+                                   "Pack files in the repository")
+    
+    def run_maintenance(self, force: bool = False, time_budget: float = None) -> bool:
+        """Run the pending maintenance tasks, or every task when forced"""
+        tasks = list(MAINTENANCE_TASKS) if force else self.maintenance.pending
+        if not tasks:
+            logger.info("No repository maintenance due")
+            return True
+        logger.info(f"Running repository maintenance: {', '.join(tasks)}")
+        return self.maintenance.run(tasks, time_budget)
+    
+    def maintain_between_triggers(self, next_fire: datetime.datetime):
+        """Run pending maintenance if the gap before next_fire is long enough
+        
+        The run is budgeted to finish a minute before the trigger; whatever
+        does not fit stays pending for the next gap.
+        """
+        if not self.maintenance.enabled or not self.maintenance.pending:
+            return
+        remaining = (next_fire - datetime.datetime.now()).total_seconds()
+        if self.maintenance.idle_long_enough(remaining):
+            self.run_maintenance(time_budget=remaining - 60)
+    
+    def plan_backfill(self, start: datetime.date, end: datetime.date):
+        """Yield every schedule fire time on the days from start to end, inclusive"""
+        first = datetime.datetime.combine(start, datetime.time()) - datetime.timedelta(minutes=1)
+        last = datetime.datetime.combine(end, datetime.time(23, 59))
+        yield from self.schedule.fires_between(first, last)
+    
+    def _git_output(self, *args: str) -> str:
+        """Run a git command and return its stripped stdout, or None on failure"""
+        result = subprocess.run(['git', *args], cwd=self.repo_path,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip()
+    
+    def read_manifest(self, ref: str = None) -> bytes:
+        """Return the manifest committed on ref (with header), or a new one"""
+        if ref:
+            result = subprocess.run(['git', 'cat-file', 'blob', f"{ref}:{self.layout_root}/MANIFEST.tsv"],
+                                    cwd=self.repo_path, capture_output=True)
+            if result.returncode == 0:
+                return result.stdout
+        return MANIFEST_HEADER.encode('utf-8')
+    
+    def migrate_layout(self) -> int:
+        """Move flat auto_generated_* files into the sharded layout in one commit
+        
+        Returns the number of files moved.
+        """
+        if self.layout_mode != 'sharded':
+            logger.error("Set layout.mode to 'sharded' in config.json before migrating")
+            return 0
+        listing = self._git_output('ls-files', '-z', '--', 'auto_generated_*')
+        pattern = re.compile(r'^auto_generated_(\d{8}_\d{6})')
+        moves = []
+        for name in filter(None, (listing or '').split('\0')):
+            match = pattern.match(name)
+            ext = os.path.splitext(name)[1]
+            if '/' in name or not match or ext not in BY_EXTENSION:
+                continue
+            if not os.path.exists(os.path.join(self.repo_path, name)):
+                logger.warning(f"Skipping {name}: missing from the working tree")
+                continue
+            moves.append((name, f"{self.shard_dir(match.group(1), ext)}/{name}", match.group(1), ext))
+        if not moves:
+            logger.info("No flat generated files to migrate")
+            return 0
+        
+        logger.info(f"Migrating {len(moves)} generated files to {self.layout_root}/...")
+        entries = []
+        paths = []
+        for old, new, timestamp, ext in moves:
+            target = os.path.join(self.repo_path, new)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(os.path.join(self.repo_path, old), target)
+            generated_at = datetime.datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+            entries.append((generated_at.isoformat(), BY_EXTENSION[ext].name, new))
+            paths += [os.path.join(self.repo_path, old), target]
+        manifest = self.append_manifest(sorted(entries))
+        if manifest:
+            paths.append(manifest)
+        
+        message = f"Migrate {len(moves)} generated files to the sharded layout"
+        if not (self.git_add(paths, include_removals=True) and self.git_commit(commit_message=message)
+                and self.queue_head()):
+            return 0
+        if self.remotes:
+            self.flush_push_queue(force=True)
+        return len(moves)
+    
+    def backfill(self, start: datetime.date, end: datetime.date, count: int = None,
+                 push: bool = False) -> int:
+        """Backfill dated history by streaming generated files into git fast-import
+        
+        Blobs and commits are written straight into the object database with
+        author/committer dates from the plan, so the working tree is never
+        touched per commit. Returns the number of commits written.
+        """
+        if self.vcs.name == 'memory':
+            logger.error("Backfill writes through git fast-import and needs a git vcs_backend")
+            return 0
+        if count is None:
+            count = self.burst_count
+        ref = f"refs/heads/{self.branch}"
+        parent = self._git_output('rev-parse', '--verify', '-q', f"{ref}^{{commit}}")
+        name = self.git_user or self._git_output('config', 'user.name') or 'Auto Code Generator'
+        email = self.git_email or self._git_output('config', 'user.email') or 'auto@example.com'
+        ident = f"{name} <{email}>".encode('utf-8')
+        width = max(3, len(str(count - 1)))
+        
+        logger.info(f"Backfilling {start} to {end} into {ref} ({count} file(s) per commit)...")
+        started = time.monotonic()
+        commits = 0
+        mark = 0
+        sharded = self.layout_mode == 'sharded'
+        manifest_entries = []
+        process = subprocess.Popen(['git', 'fast-import', '--quiet', '--done'],
+                                   cwd=self.repo_path, stdin=subprocess.PIPE)
+        stream = process.stdin
+        try:
+            planned = self.iter_planned_codes(self.plan_backfill(start, end), count)
+            upcoming = next(planned, None)
+            while upcoming is not None:
+                when, codes = upcoming
+                upcoming = next(planned, None)
+                codes = self.validate_codes(self.dedup_codes(codes, when), when)
+                # Validation may drop files; a commit left empty is skipped unless
+                # it is the last one and still has to carry the manifest
+                if not codes and (upcoming is not None or not manifest_entries):
+                    logger.warning(f"Every file planned for {when} was invalid, skipping its commit")
+                    continue
+                timestamp = when.strftime("%Y%m%d_%H%M%S")
+                files = []
+                for index, (language, code) in enumerate(codes):
+                    data = code.encode('utf-8')
+                    mark += 1
+                    stream.write(b"blob\nmark :%d\ndata %d\n%s\n" % (mark, len(data), data))
+                    filename = self.make_filename(timestamp, index if count > 1 else None, width,
+                                                  language.extension)
+                    files.append((mark, filename.encode('utf-8')))
+                    if sharded:
+                        manifest_entries.append((when.isoformat(timespec='seconds'),
+                                                 language.name, filename))
+                
+                if not codes:
+                    message = f"Update generated manifest at {when:%Y-%m-%d %H:%M:%S}"
+                elif len(codes) == 1:
+                    message = f"Auto-generated code at {when:%Y-%m-%d %H:%M:%S}"
+                else:
+                    message = f"Auto-generated {len(codes)} files at {when:%Y-%m-%d %H:%M:%S}"
+                message = message.encode('utf-8')
+                date = f"{int(when.timestamp())} {when.astimezone():%z}".encode('ascii')
+                mark += 1
+                stream.write(b"commit %s\nmark :%d\n" % (ref.encode('utf-8'), mark))
+                stream.write(b"author %s %s\ncommitter %s %s\n" % (ident, date, ident, date))
+                stream.write(b"data %d\n%s\n" % (len(message), message))
+                if commits == 0 and parent:
+                    stream.write(b"from %s\n" % parent.encode('ascii'))
+                for blob_mark, filename in files:
+                    stream.write(b"M 100644 :%d %s\n" % (blob_mark, filename))
+                # The manifest is rewritten once, in the last backfilled commit
+                if upcoming is None and manifest_entries:
+                    manifest = self.read_manifest(ref if parent else None)
+                    manifest += self.manifest_lines(manifest_entries).encode('utf-8')
+                    manifest_name = f"{self.layout_root}/MANIFEST.tsv".encode('utf-8')
+                    stream.write(b"M 100644 inline %s\ndata %d\n%s\n"
+                                 % (manifest_name, len(manifest), manifest))
+                stream.write(b"\n")
+                commits += 1
+            stream.write(b"done\n")
+            stream.close()
+        except BrokenPipeError:
+            logger.error("git fast-import exited early")
+        except BaseException:
+            # Without "done" fast-import would wait on its stdin forever
+            process.kill()
+            raise
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+            returncode = process.wait()
+        
+        if returncode != 0:
+            logger.error(f"git fast-import failed with exit code {returncode}")
+            return 0
+        
+        elapsed = time.monotonic() - started
+        rate = commits / elapsed * 60 if elapsed else 0
+        logger.info(f"Backfilled {commits} commits in {elapsed:.2f}s ({rate:.0f} commits/min)")
+        
+        # Bring index and working tree up to date once if the branch is checked out
+        if commits and self._git_output('symbolic-ref', '-q', 'HEAD') == ref:
+            trees = [parent, ref] if parent else [ref]
+            try:
+                subprocess.run(['git', 'read-tree', '-m', '-u', *trees],
+                             cwd=self.repo_path, check=True)
+            except subprocess.CalledProcessError as e:
+                logger.error(f"Error updating working tree after backfill: {e}")
+        
+        if push and commits:
+            if self.remotes:
+                self.push_queue.enqueue(self._git_output('rev-parse', ref))
+                if self.flush_push_queue(force=True):
+                    logger.info(f"Pushed {commits} backfilled commits")
+            else:
+                logger.warning("No remote URL configured, backfill kept locally only")
+        return commits
+    
+    def state_path(self, name: str) -> str:
+        """Return the path of a state file, creating the state directory"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        return os.path.join(self.state_dir, name)
+    
+    def load_state(self, name: str) -> Dict:
+        """Load a JSON state file, returning {} when missing or unreadable"""
+        try:
+            with open(os.path.join(self.state_dir, name), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def save_state(self, name: str, state: Dict):
+        """Atomically replace a JSON state file"""
+        path = self.state_path(name)
+        try:
+            write_atomic(path, json.dumps(state))
+        except OSError as e:
+            logger.error(f"Error saving state to {path}: {e}")
+    
+    def load_last_fire(self) -> datetime.datetime:
+        """Return the persisted last fire time, starting the record now if absent"""
+        state = self.load_state('scheduler.json')
+        if state.get('last_fire'):
+            return datetime.datetime.fromisoformat(state['last_fire'])
+        last_fire = datetime.datetime.now()
+        self.record_fire(last_fire)
+        return last_fire
+    
+    def record_fire(self, fire: datetime.datetime):
+        """Persist the last fire time"""
+        self.save_state('scheduler.json', {'last_fire': fire.isoformat()})
+    
+    def due_triggers(self, last_fire: datetime.datetime, now: datetime.datetime) -> tuple:
+        """Return (due, runs): every slot since last_fire and the ones to run
+        
+        The slot due now always runs; of the missed ones only the most
+        recent `schedule.max_catch_up` are run.
+        """
+        due = self.schedule.fires_between(last_fire, now)
+        runs = self.schedule.runs_for(due, now)
+        if len(due) > len(runs) or len(due) > 1 or (due and due[-1] < now - ON_TIME_GRACE):
+            logger.info(f"Missed {len(due)} trigger(s) since {last_fire}, catching up {len(runs)}")
+        return due, runs
+    
     def run_scheduler(self):
-        """Run the scheduler to generate code twice daily"""
-        logger.info("Starting scheduler for twice-daily code generation...")
+        """Run the scheduler, sleeping until each configured fire time
         
-        # Schedule times: 11:40 AM and 12:10 PM
-        morning_time = (11, 40)  # 11:40 AM
-        evening_time = (12, 10)  # 12:10 PM
+        The last fire time is persisted so that slots missed while the
+        machine was asleep or the daemon was down are caught up, up to
+        `schedule.max_catch_up` runs, as soon as the scheduler wakes.
+        """
+        logger.info(f"Starting scheduler with {len(self.schedule.expressions)} trigger(s)...")
+        last_fire = self.load_last_fire()
         
         while True:
-            current_time = datetime.datetime.now().time()
-            current_hour_min = (current_time.hour, current_time.minute)
+            now = datetime.datetime.now()
+            due, runs = self.due_triggers(last_fire, now)
+            if due:
+                for fire in runs:
+                    logger.info(f"Trigger time reached: {fire}")
+                    self.generate_and_push()
+                    self.record_fire(fire)
+                last_fire = due[-1]
+                self.record_fire(last_fire)
+                continue
             
-            # Check if it's time to generate code
-            if current_hour_min == morning_time or current_hour_min == evening_time:
-                logger.info(f"Trigger time reached: {current_time}")
-                self.generate_and_push()
-                
-                # Sleep for a minute to avoid multiple triggers
-                time.sleep(60)
-            
-            # Check every minute
-            time.sleep(60)
+            next_fire = self.schedule.next_fire(now)
+            if next_fire is None:
+                logger.error("Schedule has no upcoming trigger times, stopping scheduler")
+                return
+            logger.info(f"Next trigger at {next_fire}")
+            self.maintain_between_triggers(next_fire)
+            if self.sleep_until(next_fire):
+                # Slots of the new schedule before the reload are not caught up;
+                # the slot slept for still runs if it has been reached meanwhile
+                now = datetime.datetime.now()
+                if now < next_fire:
+                    last_fire = now
+                    self.record_fire(last_fire)
+    
+    def sleep_until(self, target: datetime.datetime, max_nap: float = 300) -> bool:
+        """Sleep until the wall clock reaches target
+        
+        Naps are capped so that a wall-clock jump (suspend/resume, clock
+        changes) is noticed within max_nap seconds. Queued pushes are
+        retried as their backoff expires, and the config file is checked
+        every `config_reload_interval` seconds. Returns True when the
+        config was reloaded, cutting the sleep short.
+        """
+        while True:
+            remaining = (target - datetime.datetime.now()).total_seconds()
+            if remaining <= 0:
+                return False
+            nap = min(remaining, max_nap)
+            if self.config_file:
+                nap = min(nap, self.config_reload_interval)
+            retry_at = self.push_queue.next_attempt()
+            if retry_at is not None:
+                if retry_at <= time.time():
+                    self.flush_push_queue()
+                    self.export_queue_gauges()
+                    continue
+                nap = min(nap, retry_at - time.time())
+            time.sleep(nap)
+            if datetime.datetime.now() >= target:
+                return False
+            if self.config_file and self.reload_config():
+                return True
+
+def positive_int(value: str) -> int:
+    """argparse type for strictly positive integers"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+def iso_date(value: str) -> datetime.date:
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date as YYYY-MM-DD, got {value}")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Automatic code generator and Git pusher")
+    parser.add_argument('--config', default='config.json',
+                        help="Path to the configuration file (default: config.json)")
+    parser.add_argument('--once', action='store_true',
+                        help="Generate and push once, then exit")
+    parser.add_argument('--count', type=positive_int,
+                        help="Number of files to generate per trigger (overrides burst_count)")
+    parser.add_argument('--target-size', type=positive_int,
+                        help="Stream every file to about this many bytes (overrides streaming.target_size)")
+    parser.add_argument('--workers', type=positive_int,
+                        help="Render large batches on this many worker processes")
+    parser.add_argument('--seed', type=int,
+                        help="Run seed; the same seed reproduces the same generated content")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Report where start-up time goes (most useful with --once)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile every run (cProfile, sampled stacks, allocations) into profiles/")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Run pushes as background asyncio tasks so slow remotes never delay triggers")
+    
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('migrate-layout',
+                          help="Move flat generated files into the sharded layout in one commit")
+    stats = subparsers.add_parser('stats', help="Summarize runs and generated files from the catalog")
+    stats.add_argument('--since', type=iso_date, help="First day to include (YYYY-MM-DD)")
+    stats.add_argument('--until', type=iso_date, help="Last day to include (YYYY-MM-DD)")
+    stats.add_argument('--language', choices=sorted(BY_EXTENSION[ext].name for ext in BY_EXTENSION),
+                       help="Only count files in this language")
+    stats.add_argument('--unpushed', action='store_true',
+                       help="List runs that were not pushed to every remote")
+    subparsers.add_parser('dedup-rebuild',
+                          help="Rebuild the content dedup index from the generated files")
+    multi = subparsers.add_parser('multi',
+                                  help="Drive several repositories from one daemon process")
+    multi.add_argument('--repos', required=True,
+                       help="Daemon config listing the repository configs")
+    multi.add_argument('--max-workers', type=positive_int,
+                       help="Repository jobs run at once (overrides max_workers)")
+    queue = subparsers.add_parser('queue', help="Show the push queue backlog")
+    queue.add_argument('--flush', action='store_true',
+                       help="Push queued commits now, ignoring backoff")
+    maintenance = subparsers.add_parser('maintenance',
+                                        help="Run due repository maintenance (repack, commit-graph, multi-pack-index)")
+    maintenance.add_argument('--all', action='store_true',
+                             help="Run every maintenance task regardless of thresholds")
+    backfill = subparsers.add_parser('backfill',
+                                     help="Backfill dated history through git fast-import")
+    backfill.add_argument('--from', dest='start', required=True, type=iso_date,
+                          help="First day to backfill (YYYY-MM-DD)")
+    backfill.add_argument('--to', dest='end', required=True, type=iso_date,
+                          help="Last day to backfill, inclusive (YYYY-MM-DD)")
+    backfill.add_argument('--count', type=positive_int, default=argparse.SUPPRESS,
+                          help="Number of files per backfilled commit")
+    backfill.add_argument('--push', action='store_true',
+                          help="Push the branch once the backfill is written")
+    
+    args = parser.parse_args(argv)
+    if args.command == 'backfill' and args.start > args.end:
+        parser.error("--from must not be after --to")
+    return args
 
 def main():
     """Main entry point"""
-    generator = AutoCodeGenerator()
+    profile = StartupProfile(_MODULE_STARTED)
+    profile.mark('imports')
+    args = parse_args()
+    profile.mark('parse_args')
+    # The config is parsed once here, for logging and then the generator; a
+    # missing or broken file is left to the generator to report once logging is up
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        config = None
+    # Logging is set up by main, so importing this module stays side-effect free
+    settings = config.get('logging', {}) if isinstance(config, dict) else {}
+    setup_logging('auto_generator.log', settings)
+    profile.mark('logging')
+    if args.command == 'multi':
+        from multi_repo import MultiRepoDaemon
+        daemon = MultiRepoDaemon.from_config(args.repos)
+        if args.max_workers:
+            daemon.max_workers = args.max_workers
+        daemon.run()
+        return
+    generator = AutoCodeGenerator(args.config, config if isinstance(config, dict) else None)
+    profile.mark('init')
+    # Command-line values survive config reloads
+    generator.override(burst_count=args.count, stream_target_size=args.target_size,
+                       workers=args.workers)
+    if args.profile:
+        generator.profile_runs = True
+    if args.seed is not None:
+        generator.seed = generator.run_seed = args.seed
     
-    # Check if we should run once or start scheduler
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == '--once':
+    # Check if we should backfill, run once or start scheduler
+    if args.command == 'backfill':
+        generator.backfill(args.start, args.end, push=args.push)
+    elif args.command == 'migrate-layout':
+        generator.migrate_layout()
+    elif args.command == 'stats':
+        generator.print_stats(args.since, args.until, args.language, args.unpushed)
+    elif args.command == 'dedup-rebuild':
+        generator.rebuild_dedup_index()
+    elif args.command == 'queue':
+        if args.flush and generator.push_queue.depth():
+            generator.flush_push_queue(force=True)
+        print(json.dumps(generator.push_queue.report(), indent=4))
+    elif args.command == 'maintenance':
+        generator.track_repo_objects(new_run=False)
+        generator.run_maintenance(force=args.all)
+    elif args.use_async:
+        import asyncio
+        from async_pipeline import AsyncPipeline
+        
+        async def run():
+            pipeline = AsyncPipeline(generator)
+            if args.once:
+                await pipeline.run_once()
+            else:
+                await pipeline.run_scheduler()
+        asyncio.run(run())
+    elif args.once:
         generator.generate_and_push()
+        profile.mark('run')
+        # Nothing waits on this process any more, so due maintenance runs now
+        if generator.maintenance.pending:
+            generator.run_maintenance()
     else:
+        # The scheduler does not return, so report start-up before entering it
+        if args.startup_profile:
+            print(profile.report(), file=sys.stderr)
         generator.run_scheduler()
+        return
+    
+    if args.startup_profile:
+        print(profile.report(generator.last_run), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
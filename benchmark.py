@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for Auto Code Generator
+Times the generators, file writes and each git stage against a temporary repo
+and a local bare remote (no network), and writes the results as JSON
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+import contextlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from auto_code_generator import AutoCodeGenerator
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples: List[float], failures: int = 0, ops_per_sample: int = 1) -> Dict:
+    """Reduce per-call latencies (seconds) to ops/sec and p50/p99 in milliseconds"""
+    total = sum(samples)
+    return {
+        'iterations': len(samples),
+        'failures': failures,
+        'ops_per_sec': round(len(samples) * ops_per_sample / total, 2) if total else None,
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 4),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 4),
+    }
+
+
+def measure(func: Callable, iterations: int, ops_per_sample: int = 1) -> Dict:
+    """Time func() iterations times; a falsy result or exception counts as a failure"""
+    samples = []
+    failures = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        try:
+            ok = func()
+        except Exception:
+            ok = False
+        samples.append(time.perf_counter() - started)
+        if ok is False or ok is None:
+            failures += 1
+    return summarize(samples, failures, ops_per_sample)
+
+
+@contextlib.contextmanager
+def quiet_output():
+    """Silence stdout/stderr of child git processes while timing"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        yield
+    finally:
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in (*saved, devnull):
+            os.close(fd)
+
+
+def create_sandbox(root: Path, vcs_backend: str = 'subprocess') -> Path:
+    """Create a work repo with a local bare remote and return its config file"""
+    remote = root / 'remote.git'
+    work = root / 'work'
+    subprocess.run(['git', 'init', '-q', '--bare', '-b', 'main', str(remote)], check=True)
+    subprocess.run(['git', 'init', '-q', '-b', 'main', str(work)], check=True)
+    subprocess.run(['git', 'remote', 'add', 'origin', remote.as_uri()], cwd=work, check=True)
+    subprocess.run(['git', '-c', 'user.name=Benchmark', '-c', 'user.email=bench@example.com',
+                    'commit', '-q', '--allow-empty', '-m', 'Benchmark root'], cwd=work, check=True)
+    subprocess.run(['git', 'push', '-q', 'origin', 'main'], cwd=work, check=True)
+
+    config_file = root / 'config.json'
+    config_file.write_text(json.dumps({
+        'repo_path': str(work),
+        'git_user': 'Benchmark',
+        'git_email': 'bench@example.com',
+        'remote_url': remote.as_uri(),
+        'vcs_backend': vcs_backend,
+    }))
+    return config_file
+
+
+def run_benchmarks(iterations: int, git_iterations: int, batch_size: int,
+                   vcs_backend: str = 'subprocess') -> Dict:
+    """Run every benchmark in a throwaway sandbox and return the results"""
+    results = {}
+    root = Path(tempfile.mkdtemp(prefix='autogen-bench-'))
+    try:
+        generator = AutoCodeGenerator(str(create_sandbox(root, vcs_backend)))
+
+        for name in ('python', 'javascript', 'cpp', 'java', 'html'):
+            method = getattr(generator, f"generate_{name}_code")
+            results[f"generate.{name}"] = measure(method, iterations)
+        results['generate.random'] = measure(generator.generate_random_code, iterations)
+        results['generate.batch'] = measure(lambda: generator.generate_random_codes(batch_size),
+                                            max(1, iterations // 10), batch_size)
+
+        code = generator.generate_python_code()
+        counter = iter(range(sys.maxsize))
+        results['file.write'] = measure(
+            lambda: generator.save_code_to_file(code, f"bench_write_{next(counter)}.py"), iterations)
+
+        stages = {'git.add': [], 'git.commit': [], 'git.push': []}
+        failures = dict.fromkeys(stages, 0)
+        with quiet_output():
+            generator.setup_git_config()
+            for index in range(git_iterations):
+                path = generator.save_code_to_file(code, f"bench_git_{index}.py")
+                for stage, call in (('git.add', lambda: generator.git_add([path])),
+                                    ('git.commit', generator.git_commit),
+                                    ('git.push', generator.git_push)):
+                    started = time.perf_counter()
+                    ok = call()
+                    stages[stage].append(time.perf_counter() - started)
+                    if not ok:
+                        failures[stage] += 1
+        for stage, samples in stages.items():
+            results[stage] = summarize(samples, failures[stage])
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def source_revision() -> str:
+    """Return the commit of the code being benchmarked, if known"""
+    result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SCRIPT_DIR,
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def print_report(results: Dict, baseline: Dict = None):
+    """Print a results table, with the ops/sec ratio against a baseline when given"""
+    header = f"{'benchmark':<18} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10} {'fail':>5}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for name, result in results.items():
+        line = (f"{name:<18} {result['ops_per_sec'] or 0:>12.1f} "
+                f"{result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} {result['failures']:>5}")
+        previous = (baseline or {}).get(name)
+        if previous and previous.get('ops_per_sec') and result['ops_per_sec']:
+            line += f" {result['ops_per_sec'] / previous['ops_per_sec']:>7.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Auto Code Generator")
+    parser.add_argument('--iterations', type=int, default=500,
+                        help="Iterations for generator and file write benchmarks")
+    parser.add_argument('--git-iterations', type=int, default=30,
+                        help="Iterations for each git stage")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="Files per generate.batch iteration")
+    parser.add_argument('--vcs', default='subprocess', choices=['subprocess', 'plumbing', 'memory'],
+                        help="VCS backend for the git stages")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="Where to write the JSON results")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run_benchmarks(args.iterations, args.git_iterations, args.batch_size, args.vcs)
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'revision': source_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'vcs_backend': args.vcs,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f).get('results')
+    print_report(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
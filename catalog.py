@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog for Auto Code Generator
+Records every run and generated file so questions about history are answered
+from indexed tables instead of logs or `git log`
+"""
+
+import json
+import sqlite3
+import datetime
+import threading
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    status TEXT NOT NULL,
+    commit_sha TEXT,
+    file_count INTEGER NOT NULL,
+    stages TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    created TEXT NOT NULL,
+    language TEXT NOT NULL,
+    template TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS runs_status ON runs(status, started);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs(commit_sha);
+CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts(created);
+CREATE INDEX IF NOT EXISTS artifacts_language ON artifacts(language, created);
+CREATE INDEX IF NOT EXISTS artifacts_hash ON artifacts(content_hash);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts(run_id);
+"""
+
+
+class Catalog:
+    """Runs and artifacts in one SQLite file
+
+    A single connection is shared by the generator's threads under a lock;
+    WAL mode keeps readers (the stats command) from blocking the writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def record_run(self, started: datetime.datetime, status: str, commit_sha: str,
+                   stages: Dict, artifacts: List[Tuple[str, str, str, str, str]]) -> int:
+        """Insert a run and its artifacts (created, language, template, hash, path)"""
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                'INSERT INTO runs (started, status, commit_sha, file_count, stages) VALUES (?, ?, ?, ?, ?)',
+                (started.isoformat(timespec='seconds'), status, commit_sha, len(artifacts),
+                 json.dumps(stages)))
+            run_id = cursor.lastrowid
+            self.db.executemany(
+                'INSERT INTO artifacts (run_id, created, language, template, content_hash, path) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(run_id, *artifact) for artifact in artifacts])
+            return run_id
+
+    def mark_pushed(self, commit_shas: List[str]):
+        """Mark the runs that produced these commits as pushed"""
+        if not commit_shas:
+            return
+        with self.lock, self.db:
+            self.db.executemany("UPDATE runs SET status = 'pushed' WHERE commit_sha = ?",
+                                [(sha,) for sha in commit_shas])
+
+    def stats(self, since: datetime.date = None, until: datetime.date = None,
+              language: str = None) -> Dict:
+        """Run outcomes and file counts by language, optionally within dates (inclusive)"""
+        run_filter, run_args = self.date_filter('started', since, until)
+        file_filter, file_args = self.date_filter('created', since, until)
+        if language:
+            file_filter += ' AND language = ?'
+            file_args.append(language)
+        with self.lock:
+            by_status = dict(self.db.execute(
+                f'SELECT status, COUNT(*) FROM runs WHERE {run_filter} GROUP BY status ORDER BY status',
+                run_args))
+            by_language = dict(self.db.execute(
+                f'SELECT language, COUNT(*) FROM artifacts WHERE {file_filter} '
+                f'GROUP BY language ORDER BY COUNT(*) DESC', file_args))
+        return {'runs': by_status, 'files': by_language}
+
+    def unpushed_runs(self, since: datetime.date = None, until: datetime.date = None,
+                      limit: int = 50) -> List[Tuple]:
+        """Most recent runs that did not reach every remote"""
+        run_filter, run_args = self.date_filter('started', since, until)
+        with self.lock:
+            return self.db.execute(
+                f"SELECT started, status, commit_sha, file_count FROM runs "
+                f"WHERE status != 'pushed' AND {run_filter} ORDER BY started DESC LIMIT ?",
+                [*run_args, limit]).fetchall()
+
+    @staticmethod
+    def date_filter(column: str, since: datetime.date, until: datetime.date) -> Tuple[str, List]:
+        """SQL condition selecting column between two dates, inclusive"""
+        conditions = ['1']
+        args = []
+        if since:
+            conditions.append(f'{column} >= ?')
+            args.append(since.isoformat())
+        if until:
+            conditions.append(f'{column} < ?')
+            args.append((until + datetime.timedelta(days=1)).isoformat())
+        return ' AND '.join(conditions), args
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Content dedup index for Auto Code Generator
+Remembers a timestamp-insensitive hash of every generated file in a
+fixed-size Bloom filter file, so repeats can be regenerated before writing
+"""
+
+import os
+import re
+import math
+import mmap
+import struct
+import hashlib
+import logging
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Render timestamps (str(datetime)) embedded by the templates
+TIMESTAMP = re.compile(r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?')
+
+MAGIC = b'AGBLOOM1'
+# magic, bit count, hash count, entries added
+HEADER = struct.Struct('<8sQIQ')
+
+
+def normalized_hash(code: str) -> bytes:
+    """128-bit hash of code with its timestamps blanked out"""
+    normalized = TIMESTAMP.sub('<timestamp>', code)
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+def hash_chunks(chunks: Iterable[str], digest) -> Iterator[str]:
+    """Pass chunks through, feeding digest as normalized_hash would the joined text
+
+    Timestamps must not straddle chunk boundaries.
+    """
+    for chunk in chunks:
+        digest.update(TIMESTAMP.sub('<timestamp>', chunk).encode('utf-8'))
+        yield chunk
+
+
+class DedupIndex:
+    """Bloom filter of content hashes, memory-mapped from a file
+
+    Sized for `capacity` entries at `error_rate` false positives (about
+    1.8 MB per million entries at 0.1%). A false positive only means a
+    fresh file is regenerated once more; duplicates are never missed.
+    """
+
+    def __init__(self, path: str, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = path
+        self.capacity = capacity
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            self.create(path, capacity, error_rate)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.bits, self.hashes, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) < HEADER.size + (self.bits + 7) // 8:
+            raise ValueError(f"{path} is not a dedup index")
+
+    @staticmethod
+    def create(path: str, capacity: int, error_rate: float):
+        """Write an empty filter sized for capacity entries at error_rate"""
+        bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, bits, hashes, 0))
+            f.truncate(HEADER.size + (bits + 7) // 8)
+        os.replace(tmp_path, path)
+
+    def positions(self, digest: bytes):
+        """Bit positions of a digest (double hashing)"""
+        first, second = struct.unpack('<QQ', digest)
+        second |= 1
+        return [(first + index * second) % self.bits for index in range(self.hashes)]
+
+    def add(self, code: str) -> bool:
+        """Record code; returns False if it (probably) was already recorded"""
+        new = False
+        view = self.map
+        for position in self.positions(normalized_hash(code)):
+            offset = HEADER.size + (position >> 3)
+            mask = 1 << (position & 7)
+            if not view[offset] & mask:
+                view[offset] |= mask
+                new = True
+        if new:
+            self.count += 1
+            if self.count == self.capacity + 1:
+                logger.warning(f"Dedup index is over its capacity of {self.capacity} entries, "
+                               f"run dedup-rebuild with a larger dedup.capacity")
+        return new
+
+    def flush(self):
+        """Persist the entry count and dirty pages"""
+        HEADER.pack_into(self.map, 0, MAGIC, self.bits, self.hashes, self.count)
+        self.map.flush()
+
+    def close(self):
+        self.flush()
+        self.map.close()
+        self.file.close()
+
+    @classmethod
+    def rebuild(cls, path: str, codes: Iterable[str], capacity: int, error_rate: float) -> 'DedupIndex':
+        """Replace the index with one built from codes"""
+        tmp_path = f"{path}.rebuild"
+        cls.create(tmp_path, capacity, error_rate)
+        index = cls(tmp_path, capacity, error_rate)
+        for code in codes:
+            index.add(code)
+        index.close()
+        os.replace(tmp_path, path)
+        return cls(path, capacity, error_rate)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Language registry for Auto Code Generator
+Binds each generator template to its file extension and samples languages by
+the configured file_types weights through a precomputed alias table
+"""
+
+import random
+import logging
+from collections import Counter
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from templates import TEMPLATES, Template
+
+logger = logging.getLogger(__name__)
+
+
+class Language(NamedTuple):
+    name: str
+    extension: str
+    template: Template
+    # First line prefix of generated files, used to recognise their language
+    marker: str
+
+
+LANGUAGES = {
+    'python': Language('python', '.py', TEMPLATES['python'], '#!/usr/bin/env python3'),
+    'javascript': Language('javascript', '.js', TEMPLATES['javascript'], '// Auto-generated JavaScript'),
+    'cpp': Language('cpp', '.cpp', TEMPLATES['cpp'], '// Auto-generated C++'),
+    'java': Language('java', '.java', TEMPLATES['java'], '// Auto-generated Java'),
+    'html': Language('html', '.html', TEMPLATES['html'], '<!DOCTYPE html>'),
+}
+
+BY_EXTENSION = {language.extension: language for language in LANGUAGES.values()}
+
+
+def detect_language(code: str) -> Language:
+    """Recognise a generated file's language from its first line, or None"""
+    first_line = code.split('\n', 1)[0]
+    for language in LANGUAGES.values():
+        if first_line.startswith(language.marker):
+            return language
+    return None
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per weighted sample"""
+
+    def __init__(self, weights: Sequence[float]):
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("alias table needs at least one positive weight")
+        scaled = [weight * count / total for weight in weights]
+        self.size = count
+        self.probability = [1.0] * count
+        self.alias = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low = small.pop()
+            high = large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Whatever remains is 1.0 up to rounding error
+        for index in small + large:
+            self.probability[index] = 1.0
+
+    def sample(self, rng=random) -> int:
+        """Draw one index"""
+        position = rng.random() * self.size
+        column = int(position)
+        return column if position - column < self.probability[column] else self.alias[column]
+
+    def sample_many(self, count: int, rng=random) -> List[int]:
+        """Draw count indices"""
+        size = self.size
+        probability = self.probability
+        alias = self.alias
+        draws = []
+        for _ in range(count):
+            position = rng.random() * size
+            column = int(position)
+            draws.append(column if position - column < probability[column] else alias[column])
+        return draws
+
+
+class LanguageRegistry:
+    """The enabled languages and their sampling weights"""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = {name: weight for name, weight in weights.items() if weight > 0}
+        if not self.weights:
+            raise ValueError("at least one language needs a positive weight")
+        self.languages = [LANGUAGES[name] for name in self.weights]
+        self.table = AliasTable(list(self.weights.values()))
+
+    @classmethod
+    def from_config(cls, file_types: List[Dict] = None) -> 'LanguageRegistry':
+        """Build a registry from config.json `file_types` (equal weights if absent)"""
+        weights = {}
+        for entry in file_types or []:
+            language = BY_EXTENSION.get(entry.get('extension'))
+            if language is None:
+                logger.warning(f"Ignoring file type with unknown extension: {entry.get('extension')}")
+                continue
+            weights[language.name] = weights.get(language.name, 0) + float(entry.get('weight', 1))
+        try:
+            return cls(weights or dict.fromkeys(LANGUAGES, 1.0))
+        except ValueError as e:
+            logger.warning(f"Invalid file_types weights ({e}), using equal weights")
+            return cls(dict.fromkeys(LANGUAGES, 1.0))
+
+    def sample(self, rng=random) -> Language:
+        """Draw one language by weight"""
+        return self.languages[self.table.sample(rng)]
+
+    def sample_many(self, count: int, rng=random) -> List[Language]:
+        """Draw count languages by weight"""
+        languages = self.languages
+        return [languages[index] for index in self.table.sample_many(count, rng)]
+
+
+def render_random(count: int, rng=random, now=None,
+                  registry: LanguageRegistry = None) -> List[Tuple[Language, str]]:
+    """Render count (language, code) pairs, languages drawn by weight
+
+    Each language is rendered as a single template batch.
+    """
+    registry = registry or LanguageRegistry(dict.fromkeys(LANGUAGES, 1.0))
+    languages = registry.sample_many(count, rng)
+    rendered = {
+        language.name: iter(language.template.render_batch(total, rng, now))
+        for language, total in Counter(languages).items()
+    }
+    return [(language, next(rendered[language.name])) for language in languages]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline shared by auto_code_generator.py and run_background.py
+Log calls only enqueue records; a background listener thread formats and
+writes them to a file rotated by size and time, gzipping rotated files
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import queue
+import atexit
+import datetime
+import logging
+import logging.handlers
+from typing import Dict, List, Tuple
+
+DEFAULTS = {
+    'level': 'INFO',
+    # 'text' or 'json' (one JSON object per line)
+    'format': 'text',
+    # Rotate once the file would exceed this many bytes (0 disables)
+    'max_bytes': 10 * 1024 * 1024,
+    # Also rotate at local midnight ('midnight'), every hour ('hourly') or never ('never')
+    'when': 'midnight',
+    # Rotated files to keep
+    'backup_count': 14,
+    'compress': True,
+}
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class RotatingLogHandler(logging.handlers.BaseRotatingHandler):
+    """File handler that rotates on size or on a time boundary, whichever comes first
+
+    Rotated files are named <file>.<YYYYmmdd-HHMMSS>[.N] and gzipped when
+    compress is set. Only the newest backup_count are kept.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, when: str = 'midnight',
+                 backup_count: int = 14, compress: bool = True):
+        super().__init__(filename, 'a', encoding='utf-8', delay=True)
+        self.max_bytes = max_bytes
+        self.when = when
+        self.backup_count = backup_count
+        if compress:
+            self.namer = lambda name: f"{name}.gz"
+            self.rotator = self.gzip_rotator
+        self.rollover_at = self.next_rollover(time.time())
+
+    def next_rollover(self, now: float) -> float:
+        """The next time boundary after now, or infinity"""
+        moment = datetime.datetime.fromtimestamp(now)
+        if self.when == 'hourly':
+            boundary = moment.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+        elif self.when == 'midnight':
+            boundary = datetime.datetime.combine(moment.date() + datetime.timedelta(days=1), datetime.time())
+        else:
+            return float('inf')
+        return boundary.timestamp()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            message = f"{self.format(record)}\n"
+            self.stream.seek(0, 2)
+            if self.stream.tell() + len(message.encode('utf-8')) > self.max_bytes:
+                return self.stream.tell() > 0
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            # Several rotations within one second get increasing counters
+            taken = [counter for (backup_stamp, counter), _ in self.backups() if backup_stamp == stamp]
+            target = f"{self.baseFilename}.{stamp}"
+            if taken:
+                target = f"{target}.{max(taken) + 1}"
+            self.rotate(self.baseFilename, self.rotation_filename(target))
+            self.remove_old_backups()
+        self.rollover_at = self.next_rollover(time.time())
+
+    @staticmethod
+    def gzip_rotator(source: str, dest: str):
+        """Compress the rotated file into dest and remove the original"""
+        import gzip
+        import shutil
+        with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def backups(self) -> List[Tuple[Tuple[str, int], str]]:
+        """Rotated files as ((stamp, counter), path), oldest first"""
+        pattern = re.compile(re.escape(os.path.basename(self.baseFilename)) + r'\.(\d{8}-\d{6})(?:\.(\d+))?')
+        backups = []
+        for path in glob.glob(f"{glob.escape(self.baseFilename)}.*"):
+            match = pattern.match(os.path.basename(path))
+            if match:
+                backups.append(((match.group(1), int(match.group(2) or 0)), path))
+        return sorted(backups)
+
+    def remove_old_backups(self):
+        """Delete rotated files beyond backup_count, oldest first"""
+        if self.backup_count <= 0:
+            return
+        for _, path in self.backups()[:-self.backup_count]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_settings(config_file: str) -> Dict:
+    """The `logging` section of a config file, or {} if it cannot be read"""
+    try:
+        with open(config_file, 'r') as f:
+            return json.load(f).get('logging', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def setup_logging(log_file: str, settings: Dict = None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a rotating file and the console
+
+    Returns the started listener; it is also stopped (and the queue flushed)
+    at interpreter exit.
+    """
+    settings = {**DEFAULTS, **(settings or {})}
+    formatter = JsonFormatter() if settings['format'] == 'json' else logging.Formatter(TEXT_FORMAT)
+    file_handler = RotatingLogHandler(settings.get('file') or log_file, int(settings['max_bytes']),
+                                      settings['when'], int(settings['backup_count']),
+                                      bool(settings['compress']))
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler, stream_handler,
+                                              respect_handler_level=True)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(getattr(logging, str(settings['level']).upper(), logging.INFO))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
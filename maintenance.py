@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Repository maintenance for Auto Code Generator
+Tracks loose objects and packs after each run and, once thresholds are crossed,
+runs incremental repack, commit-graph and multi-pack-index writes between triggers
+"""
+
+import os
+import json
+import time
+import subprocess
+import logging
+from typing import Dict, List
+
+from atomic_files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'enabled': True,
+    # Pack loose objects once this many have accumulated
+    'loose_objects': 1000,
+    # Write a multi-pack-index and consolidate small packs past this many packs
+    'packs': 20,
+    # Refresh the commit-graph after this many runs
+    'runs_per_commit_graph': 50,
+    # Only run between triggers when the next one is at least this far away
+    'min_idle_minutes': 10,
+    # Target size of packs produced by multi-pack-index repack
+    'repack_batch_size': '512m',
+}
+
+# Commands for each maintenance task, in execution order
+TASKS = {
+    'incremental-repack': [['git', 'repack', '-d', '-l', '-q']],
+    'multi-pack-index': [
+        ['git', 'multi-pack-index', 'write'],
+        ['git', 'multi-pack-index', 'expire'],
+        ['git', 'multi-pack-index', 'repack', '--batch-size={repack_batch_size}'],
+        ['git', 'multi-pack-index', 'write'],
+    ],
+    'commit-graph': [['git', 'commit-graph', 'write', '--reachable', '--split']],
+}
+
+
+class RepoMaintenance:
+    """Decides when the repository needs maintenance and performs it"""
+
+    def __init__(self, repo_path: str, state_file: str, settings: Dict = None):
+        self.repo_path = repo_path
+        self.state_file = state_file
+        self.settings = {**DEFAULTS, **(settings or {})}
+        self.state = {'pending': [], 'runs_since_commit_graph': 0}
+        try:
+            with open(state_file, 'r') as f:
+                self.state.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings['enabled'])
+
+    @property
+    def pending(self) -> List[str]:
+        return self.state['pending']
+
+    def save_state(self):
+        """Persist pending tasks and counters"""
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            write_atomic(self.state_file, json.dumps(self.state))
+        except OSError as e:
+            logger.error(f"Error saving maintenance state: {e}")
+
+    def object_stats(self) -> Dict:
+        """Parse `git count-objects -v` into integers"""
+        result = subprocess.run(['git', 'count-objects', '-v'], cwd=self.repo_path,
+                                capture_output=True, text=True)
+        stats = {}
+        for line in result.stdout.splitlines():
+            key, _, value = line.partition(':')
+            try:
+                stats[key.strip()] = int(value)
+            except ValueError:
+                pass
+        return stats
+
+    def record_run(self, new_run: bool = True) -> Dict:
+        """Update the counters after a run and queue any tasks now due
+
+        Returns the object stats so callers can export them.
+        """
+        if not self.enabled:
+            return {}
+        stats = self.object_stats()
+        if new_run:
+            self.state['runs_since_commit_graph'] += 1
+        due = []
+        if stats.get('count', 0) >= self.settings['loose_objects']:
+            due.append('incremental-repack')
+        if stats.get('packs', 0) >= self.settings['packs']:
+            due.append('multi-pack-index')
+        if self.state['runs_since_commit_graph'] >= self.settings['runs_per_commit_graph']:
+            due.append('commit-graph')
+        for task in due:
+            if task not in self.pending:
+                logger.info(f"Repository maintenance scheduled: {task}")
+                self.pending.append(task)
+        self.save_state()
+        return stats
+
+    def idle_long_enough(self, seconds_until_next_trigger: float) -> bool:
+        """Whether the gap before the next trigger leaves room for maintenance"""
+        return seconds_until_next_trigger >= self.settings['min_idle_minutes'] * 60
+
+    def run(self, tasks: List[str] = None, time_budget: float = None) -> bool:
+        """Run tasks (default: the pending ones) within an optional time budget
+
+        Tasks that do not fit in the budget stay pending for the next gap.
+        """
+        tasks = [task for task in TASKS if task in (tasks if tasks is not None else self.pending)]
+        deadline = time.monotonic() + time_budget if time_budget else None
+        ok = True
+        for task in tasks:
+            started = time.monotonic()
+            for command in TASKS[task]:
+                command = [part.format(**self.settings) for part in command]
+                timeout = deadline - time.monotonic() if deadline else None
+                if timeout is not None and timeout <= 0:
+                    logger.info("Maintenance time budget used up, deferring remaining tasks")
+                    self.save_state()
+                    return False
+                try:
+                    subprocess.run(command, cwd=self.repo_path, check=True,
+                                   capture_output=True, timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"Maintenance command timed out: {' '.join(command)}")
+                    ok = False
+                    break
+                except subprocess.CalledProcessError as e:
+                    logger.error(f"Maintenance command failed: {' '.join(command)}: "
+                                 f"{e.stderr.decode(errors='replace').strip()}")
+                    ok = False
+                    break
+            else:
+                logger.info(f"Repository maintenance {task} done in {time.monotonic() - started:.2f}s")
+                if task in self.pending:
+                    self.pending.remove(task)
+                if task == 'commit-graph':
+                    self.state['runs_since_commit_graph'] = 0
+        self.save_state()
+        return ok
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Run metrics for Auto Code Generator
+Times each pipeline stage and exports a Prometheus textfile plus JSON lines
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+import logging
+from typing import Callable, Dict
+
+from atomic_files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'autogen'
+
+
+class RunRecord:
+    """Stage timings of one run, reported to the shared Metrics on the fly"""
+
+    def __init__(self, metrics: 'Metrics'):
+        self.metrics = metrics
+        self.started = datetime.datetime.now()
+        self.stages = {}
+        # Files written and commit made by the run, for the catalog
+        self.artifacts = []
+        self.commit = None
+
+    def time(self, stage: str, func: Callable, *args, **kwargs):
+        """Call func under a monotonic timer; None/False results count as failures"""
+        started = time.monotonic()
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            ok = result is not None and result is not False
+            return result
+        finally:
+            self.record(stage, time.monotonic() - started, ok)
+
+    def record(self, stage: str, seconds: float, ok: bool):
+        """Record a stage timing measured elsewhere"""
+        self.stages[stage] = {'seconds': round(seconds, 6), 'ok': ok}
+        self.metrics.observe(stage, seconds, ok)
+
+
+class Metrics:
+    """Cumulative stage counters and last-run durations
+
+    Counters are persisted in a small state file so they keep counting
+    across `--once` processes, as Prometheus counters should.
+    """
+
+    def __init__(self, textfile: str = None, jsonl: str = None, state_file: str = None):
+        self.textfile = textfile
+        self.jsonl = jsonl
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.gauges = {}
+        self.counters = {'runs': 0, 'stages': {}, 'seconds': {}}
+        if state_file:
+            try:
+                with open(state_file, 'r') as f:
+                    self.counters.update(json.load(f))
+            except (FileNotFoundError, ValueError):
+                pass
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.textfile or self.jsonl)
+
+    def new_run(self) -> RunRecord:
+        """Start recording a run"""
+        return RunRecord(self)
+
+    def observe(self, stage: str, seconds: float, ok: bool):
+        """Update counters and the last duration of a stage"""
+        outcome = 'success' if ok else 'failure'
+        with self.lock:
+            self.durations[stage] = seconds
+            counts = self.counters['stages'].setdefault(stage, {'success': 0, 'failure': 0})
+            counts[outcome] += 1
+            self.counters['seconds'][stage] = self.counters['seconds'].get(stage, 0.0) + seconds
+
+    def set_gauge(self, name: str, value: float, help_text: str = ''):
+        """Set an extra gauge exported alongside the stage metrics"""
+        with self.lock:
+            self.gauges[name] = (value, help_text)
+
+    def finish(self, run: RunRecord, **fields):
+        """Append the run to the JSONL log and rewrite the Prometheus textfile"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters['runs'] += 1
+            record = {'timestamp': run.started.isoformat(), 'stages': run.stages, **fields}
+            try:
+                if self.jsonl:
+                    with open(self.jsonl, 'a') as f:
+                        f.write(json.dumps(record) + '\n')
+                if self.textfile:
+                    self.write_textfile()
+                if self.state_file:
+                    self.save_state()
+            except OSError as e:
+                logger.error(f"Error exporting metrics: {e}")
+
+    def write_textfile(self):
+        """Atomically replace the node-exporter textfile"""
+        lines = [
+            f"# HELP {PREFIX}_stage_duration_seconds Duration of the last execution of each stage",
+            f"# TYPE {PREFIX}_stage_duration_seconds gauge",
+        ]
+        for stage, seconds in sorted(self.durations.items()):
+            lines.append(f'{PREFIX}_stage_duration_seconds{{stage="{stage}"}} {seconds:.6f}')
+        lines += [
+            f"# HELP {PREFIX}_stage_total Stage executions by outcome",
+            f"# TYPE {PREFIX}_stage_total counter",
+        ]
+        for stage, counts in sorted(self.counters['stages'].items()):
+            for outcome, count in sorted(counts.items()):
+                lines.append(f'{PREFIX}_stage_total{{stage="{stage}",outcome="{outcome}"}} {count}')
+        lines += [
+            f"# HELP {PREFIX}_stage_seconds_total Cumulative time spent in each stage",
+            f"# TYPE {PREFIX}_stage_seconds_total counter",
+        ]
+        for stage, seconds in sorted(self.counters['seconds'].items()):
+            lines.append(f'{PREFIX}_stage_seconds_total{{stage="{stage}"}} {seconds:.6f}')
+        lines += [
+            f"# HELP {PREFIX}_runs_total Exported run records",
+            f"# TYPE {PREFIX}_runs_total counter",
+            f"{PREFIX}_runs_total {self.counters['runs']}",
+            f"# HELP {PREFIX}_last_run_timestamp_seconds Unix time of the last exported run",
+            f"# TYPE {PREFIX}_last_run_timestamp_seconds gauge",
+            f"{PREFIX}_last_run_timestamp_seconds {time.time():.3f}",
+        ]
+        for name, (value, help_text) in sorted(self.gauges.items()):
+            lines += [
+                f"# HELP {PREFIX}_{name} {help_text or name}",
+                f"# TYPE {PREFIX}_{name} gauge",
+                f"{PREFIX}_{name} {value}",
+            ]
+        write_atomic(self.textfile, '\n'.join(lines) + '\n')
+
+    def save_state(self):
+        """Persist cumulative counters"""
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        write_atomic(self.state_file, json.dumps(self.counters))
+
+
+def from_config(config: Dict, state_file: str) -> Metrics:
+    """Build Metrics from the config.json `metrics` section"""
+    section = config.get('metrics', {})
+    if not section.get('enabled', True):
+        return Metrics()
+    return Metrics(section.get('textfile', 'auto_generator.prom'),
+                   section.get('jsonl', 'auto_generator_metrics.jsonl'),
+                   state_file)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Multi-repository daemon for Auto Code Generator
+Drives many repositories from one process: a single scheduler loop decides
+what is due and a bounded worker pool runs each repository's jobs
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (Windows); the in-process lock still applies
+    fcntl = None
+
+from auto_code_generator import AutoCodeGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class RepoJob:
+    """One repository's generator, schedule position and locks
+
+    The thread lock keeps two workers off the same repository; the file lock
+    in its state directory keeps other daemons off it as well.
+    """
+
+    def __init__(self, name: str, generator: AutoCodeGenerator):
+        self.name = name
+        self.generator = generator
+        self.lock = threading.Lock()
+        self.lock_file = None
+        self.busy = False
+        self.last_fire = generator.load_last_fire()
+        self.next_fire = generator.schedule.next_fire(self.last_fire)
+        self.maintained_for = None
+
+    def acquire(self) -> bool:
+        """Take the repository's thread and file locks without blocking"""
+        if not self.lock.acquire(blocking=False):
+            return False
+        if fcntl is None:
+            return True
+        try:
+            self.lock_file = open(self.generator.state_path('daemon.lock'), 'w')
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self.lock_file is not None:
+                self.lock_file.close()
+                self.lock_file = None
+            self.lock.release()
+            return False
+
+    def release(self):
+        """Drop both locks"""
+        if self.lock_file is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+        self.lock.release()
+
+    def run_due(self):
+        """Run the triggers that are due, catching up like run_scheduler does"""
+        generator = self.generator
+        due, runs = generator.due_triggers(self.last_fire, datetime.datetime.now())
+        for fire in runs:
+            logger.info(f"[{self.name}] Trigger time reached: {fire}")
+            generator.generate_and_push()
+            generator.record_fire(fire)
+        if due:
+            self.last_fire = due[-1]
+            generator.record_fire(self.last_fire)
+
+
+class MultiRepoDaemon:
+    """Shared scheduler loop over many repositories
+
+    Each pass submits due triggers, push retries and between-trigger
+    maintenance to the worker pool, at most one job per repository at a
+    time, then sleeps until the earliest next event or until a job finishes.
+    An exception in one repository is logged and does not affect the others.
+    """
+
+    def __init__(self, jobs: List[RepoJob], max_workers: int = 4):
+        self.jobs = jobs
+        self.max_workers = max(1, max_workers)
+        self.wakeup = threading.Event()
+        self.pool = None
+
+    @classmethod
+    def from_config(cls, config_file: str) -> 'MultiRepoDaemon':
+        """Build the daemon from a file with `repos`, `defaults` and `max_workers`
+
+        Each entry of `repos` is either a path to a single-repo config file
+        (relative to the daemon config) or an inline config; both are layered
+        over `defaults`.
+        """
+        with open(config_file, 'r') as f:
+            config = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(config_file))
+        defaults = config.get('defaults', {})
+        jobs = []
+        for entry in config.get('repos', []):
+            try:
+                if isinstance(entry, str):
+                    with open(os.path.join(base_dir, entry), 'r') as f:
+                        entry = json.load(f)
+                repo_config = {**defaults, **entry}
+                name = repo_config.get('name') or os.path.basename(
+                    os.path.abspath(repo_config.get('repo_path', '.')))
+                if any(job.name == name for job in jobs):
+                    logger.error(f"Skipping repository with duplicate name: {name}")
+                    continue
+                # Keep each repository's metrics apart unless configured otherwise
+                repo_config.setdefault('metrics', {
+                    'textfile': f"auto_generator_{name}.prom",
+                    'jsonl': f"auto_generator_metrics_{name}.jsonl",
+                })
+                jobs.append(RepoJob(name, AutoCodeGenerator(None, config=repo_config)))
+            except (OSError, ValueError) as e:
+                logger.error(f"Skipping repository config {entry}: {e}")
+        return cls(jobs, int(config.get('max_workers', 4)))
+
+    def submit(self, job: RepoJob, func: Callable, *args):
+        """Run func on the pool unless the repository already has a job"""
+        if job.busy:
+            return
+        job.busy = True
+        self.pool.submit(self.guarded, job, func, *args)
+
+    def guarded(self, job: RepoJob, func: Callable, *args):
+        """Run one repository job under its locks, isolating its failures"""
+        try:
+            if not job.acquire():
+                logger.warning(f"[{job.name}] Repository is locked by another process, skipping")
+                return
+            try:
+                func(*args)
+            finally:
+                job.release()
+        except Exception as e:
+            logger.error(f"[{job.name}] Job failed: {e}")
+        finally:
+            job.busy = False
+            self.wakeup.set()
+
+    def dispatch(self, now: datetime.datetime) -> List[float]:
+        """Submit every job that is due and return the times of the upcoming events"""
+        upcoming = []
+        for job in self.jobs:
+            generator = job.generator
+            if job.busy:
+                continue
+            if job.next_fire is not None and job.next_fire <= now:
+                job.next_fire = generator.schedule.next_fire(now)
+                self.submit(job, job.run_due)
+                continue
+            retry_at = generator.push_queue.next_attempt()
+            if retry_at is not None and retry_at <= time.time():
+                self.submit(job, generator.flush_push_queue)
+                continue
+            if job.next_fire is None:
+                continue
+            if generator.maintenance.pending and job.maintained_for != job.next_fire:
+                job.maintained_for = job.next_fire
+                self.submit(job, generator.maintain_between_triggers, job.next_fire)
+                continue
+            upcoming.append((job.next_fire - now).total_seconds())
+            if retry_at is not None:
+                upcoming.append(retry_at - time.time())
+        return upcoming
+
+    def run(self, max_nap: float = 300):
+        """Run the shared scheduler loop until interrupted"""
+        if not self.jobs:
+            logger.error("No repositories configured, nothing to do")
+            return
+        logger.info(f"Starting multi-repo daemon for {len(self.jobs)} repositories "
+                    f"on {self.max_workers} worker(s)...")
+        for job in self.jobs:
+            logger.info(f"[{job.name}] Next trigger at {job.next_fire}")
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='repo')
+        try:
+            while True:
+                self.wakeup.clear()
+                upcoming = self.dispatch(datetime.datetime.now())
+                nap = min([max_nap] + upcoming)
+                if nap > 0:
+                    self.wakeup.wait(nap)
+        except KeyboardInterrupt:
+            logger.info("Multi-repo daemon stopped by user")
+        finally:
+            self.pool.shutdown(wait=True)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Parallel code generation for Auto Code Generator
+Renders batches on a process pool with deterministic, worker-count independent seeding
+"""
+
+import hashlib
+import random
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from languages import LANGUAGES, LanguageRegistry, render_random
+
+# Files rendered per task; fixed so that seeding never depends on worker count
+CHUNK_SIZE = 1024
+
+
+def derive_seed(run_seed: int, *keys) -> int:
+    """Derive a stable 64-bit seed from the run seed and a task key"""
+    material = ':'.join(str(part) for part in (run_seed, *keys)).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(material, digest_size=8).digest(), 'big')
+
+
+def render_task(task: Tuple) -> List[Tuple[str, str]]:
+    """Render one task (seed, count, now, weights) as (language name, code) pairs"""
+    seed, count, now, weights = task
+    registry = LanguageRegistry(weights)
+    return [(language.name, code)
+            for language, code in render_random(count, random.Random(seed), now, registry)]
+
+
+def chunk_tasks(run_seed: int, batch: int, count: int, now, weights: Dict[str, float]) -> List[Tuple]:
+    """Split a batch of count files into fixed-size, individually seeded tasks"""
+    return [
+        (derive_seed(run_seed, batch, index), min(CHUNK_SIZE, count - start), now, weights)
+        for index, start in enumerate(range(0, count, CHUNK_SIZE))
+    ]
+
+
+def iter_rendered(tasks: Iterable[Tuple], workers: int = 1) -> Iterator[List[Tuple]]:
+    """Yield each task's rendered (Language, code) pairs, in task order
+
+    Each task is seeded independently, so the output is byte-identical for
+    the same seeds whether it runs in-process or on any number of workers.
+    """
+    if workers <= 1:
+        results = map(render_task, tasks)
+    else:
+        # Imported here: multiprocessing is only needed with several workers
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(render_task, tasks)
+    try:
+        for pairs in results:
+            yield [(LANGUAGES[name], code) for name, code in pairs]
+    finally:
+        if workers > 1:
+            pool.shutdown()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Run profiling for Auto Code Generator
+Wraps a run in cProfile, tracemalloc and a stack-sampling thread, and writes
+a pstats dump and report, collapsed stacks for flamegraph tools and a
+top-allocations summary
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc (and cProfile from Python 3.12) are process-wide: one profile at a time
+ACTIVE = threading.Lock()
+
+
+def frame_name(frame) -> str:
+    """Collapsed-stack name of a frame: function (file:line)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of every other thread every interval seconds
+
+    Unlike cProfile, which only keeps caller/callee pairs, this keeps whole
+    stacks, rooted at the thread name, ready for flamegraph.pl or speedscope.
+    Time spent waiting on git shows up under subprocess calls.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        """One `frame;frame;... count` line per distinct stack"""
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class RunProfiler:
+    """Context manager profiling one run into output_dir
+
+    Files are named <prefix>-<YYYYmmdd-HHMMSS> with the extensions
+    .pstats (cProfile dump), .txt (report sorted by cumulative time),
+    .collapsed (sampled stacks) and .alloc.txt (top allocations). A run
+    that starts while another is being profiled, as can happen in the
+    multi-repository daemon, runs unprofiled.
+    """
+
+    def __init__(self, output_dir: str, prefix: str = 'profile', interval: float = 0.005,
+                 top: int = 25, frames: int = 10):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.profile = None
+        self.sampler = None
+        self.started = None
+        self.active = False
+
+    def __enter__(self) -> 'RunProfiler':
+        self.active = ACTIVE.acquire(blocking=False)
+        if not self.active:
+            logger.info("Another run is being profiled, not profiling this one")
+            return self
+        self.started = time.monotonic()
+        tracemalloc.start(self.frames)
+        self.sampler = StackSampler(self.interval)
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.active:
+            return
+        try:
+            self.profile.disable()
+            self.sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.write(snapshot, current, peak)
+        except Exception as e:
+            # A broken profile must never fail the run it was watching
+            logger.error(f"Error writing profile to {self.output_dir}: {e}")
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.active = False
+            ACTIVE.release()
+
+    def write(self, snapshot: tracemalloc.Snapshot, current: int, peak: int):
+        """Write the pstats dump, the report, collapsed stacks and allocations"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.prefix}-{time.strftime('%Y%m%d-%H%M%S')}")
+        elapsed = time.monotonic() - self.started
+
+        self.profile.dump_stats(f"{base}.pstats")
+        with open(f"{base}.txt", 'w') as f:
+            f.write(f"Run took {elapsed:.3f}s\n\n")
+            stats = pstats.Stats(self.profile, stream=f)
+            stats.sort_stats('cumulative').print_stats(self.top)
+
+        with open(f"{base}.collapsed", 'w') as f:
+            f.write(self.sampler.collapsed())
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ])
+        with open(f"{base}.alloc.txt", 'w') as f:
+            f.write(f"Traced memory: {current / 1024:.1f} KiB at the end, {peak / 1024:.1f} KiB peak\n\n")
+            f.write(f"Top {self.top} allocation sites still held at the end of the run:\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+        logger.info(f"Profile written to {base}.* ({elapsed:.2f}s run, "
+                    f"{sum(self.sampler.stacks.values())} stack samples)")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Durable push queue for Auto Code Generator
+Records every local commit on disk until each remote has acknowledged it, and
+flushes the backlog with one push per remote and exponential backoff
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from atomic_files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class PushQueue:
+    """Commits awaiting push, persisted as JSON in the state directory
+
+    Each entry lists the remotes that still have to acknowledge it. Pushing
+    the branch sends every commit up to its tip, so one successful push acks
+    all entries queued so far for that remote, however many there are.
+    Failed remotes are retried after base_delay * 2**(failures - 1) seconds,
+    capped at max_delay.
+    """
+
+    def __init__(self, state_file: str, remotes: List[str],
+                 base_delay: float = 30, max_delay: float = 3600):
+        self.state_file = state_file
+        self.remotes = []
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.RLock()
+        # Called with the SHAs that every remote has received
+        self.on_delivered = None
+        self.entries = []
+        self.status = {}
+        try:
+            with open(state_file, 'r') as f:
+                state = json.load(f)
+            self.entries = state.get('entries', [])
+            self.status = state.get('remotes', {})
+        except (FileNotFoundError, ValueError):
+            pass
+        self.set_remotes(remotes)
+
+    def set_remotes(self, remotes: List[str]):
+        """Change the remotes to deliver to, forgetting removed ones"""
+        with self.lock:
+            self.remotes = list(remotes)
+            for entry in self.entries:
+                entry['pending'] = [remote for remote in entry['pending'] if remote in self.remotes]
+            self.entries = [entry for entry in self.entries if entry['pending']]
+            for remote in self.remotes:
+                self.status.setdefault(remote, {'failures': 0, 'next_attempt': 0, 'last_error': None,
+                                                'last_success': None})
+
+    def save(self):
+        """Atomically persist the queue"""
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            write_atomic(self.state_file, json.dumps({'entries': self.entries, 'remotes': self.status}))
+        except OSError as e:
+            logger.error(f"Error saving push queue: {e}")
+
+    def enqueue(self, sha: str, now: float = None):
+        """Record a new local commit that every remote still has to receive"""
+        if not self.remotes:
+            return
+        with self.lock:
+            self.entries.append({'sha': sha, 'queued_at': now or time.time(),
+                                 'pending': list(self.remotes)})
+            self.save()
+
+    def depth(self, remote: str = None) -> int:
+        """Commits not yet acknowledged by remote (by any remote if None)"""
+        with self.lock:
+            return sum(1 for entry in self.entries
+                       if remote is None or remote in entry['pending'])
+
+    def oldest_age(self, now: float = None) -> float:
+        """Seconds since the oldest unacknowledged commit was queued (0 if empty)"""
+        with self.lock:
+            if not self.entries:
+                return 0.0
+            return max(0.0, (now or time.time()) - self.entries[0]['queued_at'])
+
+    def tip(self, remote: str) -> str:
+        """The newest commit remote still has to receive, or None"""
+        with self.lock:
+            for entry in reversed(self.entries):
+                if remote in entry['pending']:
+                    return entry['sha']
+            return None
+
+    def due_remotes(self, now: float = None, force: bool = False) -> List[str]:
+        """Remotes with pending commits whose backoff has expired"""
+        now = now or time.time()
+        with self.lock:
+            return [remote for remote in self.remotes
+                    if self.tip(remote) and (force or self.status[remote]['next_attempt'] <= now)]
+
+    def next_attempt(self) -> float:
+        """Earliest time a pending remote may be retried, or None if nothing is pending"""
+        with self.lock:
+            times = [self.status[remote]['next_attempt'] for remote in self.remotes if self.tip(remote)]
+            return min(times) if times else None
+
+    def ack(self, remote: str, sha: str, now: float = None):
+        """Mark every entry up to and including sha as received by remote"""
+        with self.lock:
+            for entry in self.entries:
+                if remote in entry['pending']:
+                    entry['pending'].remove(remote)
+                if entry['sha'] == sha:
+                    break
+            delivered = [entry['sha'] for entry in self.entries if not entry['pending']]
+            self.entries = [entry for entry in self.entries if entry['pending']]
+            self.status[remote].update(failures=0, next_attempt=0, last_error=None,
+                                       last_success=now or time.time())
+            self.save()
+        if delivered and self.on_delivered:
+            self.on_delivered(delivered)
+
+    def fail(self, remote: str, error: str, now: float = None) -> float:
+        """Record a failed push and schedule the retry; returns the delay"""
+        with self.lock:
+            status = self.status[remote]
+            status['failures'] += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (status['failures'] - 1))
+            status['next_attempt'] = (now or time.time()) + delay
+            status['last_error'] = error
+            self.save()
+            return delay
+
+    def flush(self, push: Callable[[List[str]], Dict[str, Tuple[bool, str]]],
+              force: bool = False) -> bool:
+        """Push each due remote once, covering all of its pending commits
+
+        push(remotes) pushes to all of them and returns {remote: (ok, detail)}.
+        Returns False if any remote failed.
+        """
+        due = self.due_remotes(force=force)
+        if not due:
+            return True
+        tips = {remote: (self.tip(remote), self.depth(remote)) for remote in due}
+        results = push(due)
+        ok = True
+        for remote, (sha, depth) in tips.items():
+            pushed, detail = results.get(remote, (False, 'not pushed'))
+            if pushed:
+                self.ack(remote, sha)
+                if depth > 1:
+                    logger.info(f"Pushed {depth} queued commits to {remote} in one push")
+            else:
+                delay = self.fail(remote, detail)
+                logger.warning(f"Push to {remote} failed, {depth} commit(s) queued, "
+                               f"retrying in {delay:.0f}s")
+                ok = False
+        return ok
+
+    def report(self, now: float = None) -> Dict:
+        """Queue depth, age and per-remote retry state"""
+        now = now or time.time()
+        with self.lock:
+            return {
+                'depth': self.depth(),
+                'oldest_age_seconds': round(self.oldest_age(now), 1),
+                'remotes': {remote: {**self.status[remote], 'depth': self.depth(remote)}
+                            for remote in self.remotes},
+            }
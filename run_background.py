@@ -8,79 +8,215 @@ import os
 import sys
 import time
 import signal
+import selectors
 import subprocess
 import logging
 from pathlib import Path
 
-# Set up logging
+from logging_setup import read_settings, setup_logging
+
 log_file = Path(__file__).parent / 'background_service.log'
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 class BackgroundService:
-    def __init__(self):
+    """Supervises the generator process without polling
+
+    The loop blocks in a selector on the child's stdout/stderr pipes and on
+    a signal wakeup fd, so a SIGCHLD wakes it the moment the child exits; the
+    child is then reaped with waitpid. Output is streamed into this service's
+    log line by line. Restarts back off exponentially when the child dies
+    soon after starting, and a crash loop holds restarts off for max_delay.
+    """
+
+    def __init__(self, args=None, base_delay: float = 1.0, max_delay: float = 300.0,
+                 stable_after: float = 60.0, crash_loop_count: int = 5, crash_loop_window: float = 120.0,
+                 stop_timeout: float = 10.0):
         self.running = True
         self.script_path = Path(__file__).parent / 'auto_code_generator.py'
+        self.args = list(args or [])
         self.process = None
-        
-    def signal_handler(self, signum, frame):
-        """Handle shutdown signals gracefully"""
-        logger.info(f"Received signal {signum}, shutting down...")
-        self.running = False
-        if self.process:
-            self.process.terminate()
-        sys.exit(0)
-    
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # A child that lives this long counts as healthy and resets the backoff
+        self.stable_after = stable_after
+        self.crash_loop_count = crash_loop_count
+        self.crash_loop_window = crash_loop_window
+        self.stop_timeout = stop_timeout
+        self.failures = 0
+        self.crashes = []
+        self.started_at = None
+        self.restart_at = None
+        self.selector = selectors.DefaultSelector()
+        # Partial last line of each open child pipe, by fd
+        self.buffers = {}
+        self.wakeup_r = self.wakeup_w = None
+
+    def handle_signal(self, signum, frame):
+        """Note shutdown requests; the wakeup fd wakes the loop"""
+        if signum in (signal.SIGTERM, signal.SIGINT) and self.running:
+            self.running = False
+
     def setup_signal_handlers(self):
-        """Setup signal handlers for graceful shutdown"""
-        signal.signal(signal.SIGTERM, self.signal_handler)
-        signal.signal(signal.SIGINT, self.signal_handler)
-    
+        """Route SIGCHLD, SIGTERM and SIGINT to the wakeup fd"""
+        self.wakeup_r, self.wakeup_w = os.pipe()
+        os.set_blocking(self.wakeup_r, False)
+        os.set_blocking(self.wakeup_w, False)
+        signal.set_wakeup_fd(self.wakeup_w)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ, 'wakeup')
+        for signum in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.handle_signal)
+
+    def spawn(self):
+        """Start the generator with its output on non-blocking pipes"""
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        self.process = subprocess.Popen([sys.executable, str(self.script_path), *self.args],
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        for stream, name in ((self.process.stdout, 'stdout'), (self.process.stderr, 'stderr')):
+            os.set_blocking(stream.fileno(), False)
+            self.buffers[stream.fileno()] = b''
+            self.selector.register(stream, selectors.EVENT_READ, name)
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        logger.info(f"Service started with PID: {self.process.pid}")
+
+    def read_output(self, stream, name: str) -> bool:
+        """Forward complete lines from a child pipe to the log
+
+        Returns False once the pipe has nothing more to read for now.
+        """
+        fd = stream.fileno()
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return False
+        if not data:
+            rest = self.buffers.pop(fd)
+            if rest:
+                logger.info(f"[child {name}] {rest.decode(errors='replace').rstrip()}")
+            self.selector.unregister(stream)
+            stream.close()
+            return False
+        lines = (self.buffers[fd] + data).split(b'\n')
+        self.buffers[fd] = lines.pop()
+        for line in lines:
+            logger.info(f"[child {name}] {line.decode(errors='replace').rstrip()}")
+        return True
+
+    def drain_output(self):
+        """Read whatever the exited child left in its pipes"""
+        for key in list(self.selector.get_map().values()):
+            if key.data != 'wakeup':
+                while self.read_output(key.fileobj, key.data):
+                    pass
+
+    def reap(self):
+        """Collect exited children with waitpid and schedule a restart"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.process is None or pid != self.process.pid:
+                continue
+            # Same convention as subprocess: negative signal number when killed
+            self.process.returncode = (os.WEXITSTATUS(status) if os.WIFEXITED(status)
+                                       else -os.WTERMSIG(status))
+            self.drain_output()
+            self.child_exited(self.process.returncode)
+            self.process = None
+
+    def child_exited(self, returncode: int):
+        """Decide when to restart the child that just exited"""
+        now = time.monotonic()
+        uptime = now - self.started_at
+        logger.warning(f"Process exited with code {returncode} after {uptime:.1f}s")
+        if not self.running:
+            return
+        if uptime >= self.stable_after:
+            self.failures = 0
+            self.crashes = []
+            delay = 0.0
+        else:
+            self.failures += 1
+            self.crashes = [moment for moment in self.crashes if now - moment < self.crash_loop_window]
+            self.crashes.append(now)
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+            if len(self.crashes) >= self.crash_loop_count:
+                delay = self.max_delay
+                logger.error(f"Crash loop detected ({len(self.crashes)} crashes in "
+                             f"{self.crash_loop_window:.0f}s), holding restarts for {delay:.0f}s")
+        self.restart_at = now + delay
+        if delay:
+            logger.info(f"Restarting in {delay:.1f}s")
+
+    def drain_wakeup(self):
+        """Empty the signal wakeup pipe"""
+        try:
+            while os.read(self.wakeup_r, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def stop_child(self):
+        """Terminate the child, killing it if it outlives stop_timeout"""
+        if self.process is None:
+            return
+        self.process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        while self.process is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("Process did not stop in time, killing it")
+                self.process.kill()
+                deadline = float('inf')
+            self.wait_events(None if remaining == float('inf') else max(0.0, remaining))
+        logger.info("Service terminated")
+
+    def wait_events(self, timeout):
+        """Block until output, a signal or the timeout, and handle what arrived"""
+        try:
+            events = self.selector.select(timeout)
+        except InterruptedError:
+            events = []
+        for key, _ in events:
+            if key.data == 'wakeup':
+                self.drain_wakeup()
+            else:
+                self.read_output(key.fileobj, key.data)
+        self.reap()
+
     def start_service(self):
         """Start the background service"""
         logger.info("Starting Auto Code Generator background service...")
         self.setup_signal_handlers()
-        
+
         try:
-            # Start the main script
-            self.process = subprocess.Popen([
-                sys.executable, 
-                str(self.script_path)
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            
-            logger.info(f"Service started with PID: {self.process.pid}")
-            
-            # Monitor the process
+            self.spawn()
             while self.running:
-                if self.process.poll() is not None:
-                    # Process died, restart it
-                    logger.warning("Process died, restarting...")
-                    self.process = subprocess.Popen([
-                        sys.executable, 
-                        str(self.script_path)
-                    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    logger.info(f"Service restarted with PID: {self.process.pid}")
-                
-                time.sleep(10)  # Check every 10 seconds
-                
-        except KeyboardInterrupt:
-            logger.info("Service stopped by user")
+                if self.process is None and self.restart_at is not None:
+                    remaining = self.restart_at - time.monotonic()
+                    if remaining <= 0:
+                        self.spawn()
+                        continue
+                    self.wait_events(remaining)
+                else:
+                    self.wait_events(None)
+            logger.info("Shutdown requested")
         except Exception as e:
             logger.error(f"Service error: {e}")
         finally:
-            if self.process:
-                self.process.terminate()
-                logger.info("Service terminated")
+            self.stop_child()
+            signal.set_wakeup_fd(-1)
 
 def main():
-    service = BackgroundService()
+    # Uses the `logging` section of the generator's config.json
+    settings = read_settings(str(Path(__file__).parent / 'config.json'))
+    settings.pop('file', None)
+    setup_logging(str(log_file), settings)
+    # Arguments are passed through to auto_code_generator.py
+    service = BackgroundService(sys.argv[1:])
     service.start_service()
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Schedule computation for Auto Code Generator
+Turns the config.json schedule (HH:MM slots and cron expressions) into fire times
+"""
+
+import datetime
+import logging
+from typing import Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+# Slots used when config.json does not define any
+DEFAULT_TIMES = ['11:40', '12:10']
+
+# Schedule keys that are settings rather than HH:MM slots
+RESERVED_KEYS = {'times', 'cron', 'max_catch_up'}
+
+# A slot this close to now is on time rather than missed (the scheduler naps
+# at most five minutes, and a long run can delay the next check)
+ON_TIME_GRACE = datetime.timedelta(minutes=5)
+
+
+def parse_field(field: str, low: int, high: int) -> Set[int]:
+    """Parse one cron field (`*`, `a`, `a-b`, `*/n`, `a-b/n` and comma lists)"""
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"invalid step in cron field: {field}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron field out of range {low}-{high}: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = sorted(parse_field(fields[0], 0, 59))
+        self.hours = sorted(parse_field(fields[1], 0, 23))
+        self.days = parse_field(fields[2], 1, 31)
+        self.months = parse_field(fields[3], 1, 12)
+        # Both 0 and 7 mean Sunday
+        self.weekdays = {day % 7 for day in parse_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @classmethod
+    def from_time(cls, value: str) -> 'CronExpression':
+        """Build a daily expression from an HH:MM slot"""
+        hour, minute = (int(part) for part in value.split(':'))
+        return cls(f"{minute} {hour} * * *")
+
+    def matches_date(self, date: datetime.date) -> bool:
+        """Check the month and day fields, with cron's day-of-month/day-of-week OR rule"""
+        if date.month not in self.months:
+            return False
+        day_match = date.day in self.days
+        weekday_match = (date.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """Return the first matching minute strictly after moment"""
+        start = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        # Four years plus a day covers every day-of-month/weekday/leap-day combination
+        for offset in range(4 * 366 + 1):
+            date = start.date() + datetime.timedelta(days=offset)
+            if not self.matches_date(date):
+                continue
+            for hour in self.hours:
+                if offset == 0 and hour < start.hour:
+                    continue
+                for minute in self.minutes:
+                    if offset == 0 and hour == start.hour and minute < start.minute:
+                        continue
+                    return datetime.datetime.combine(date, datetime.time(hour, minute))
+        return None
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+
+class Schedule:
+    """A set of trigger expressions with next-fire and missed-run lookups"""
+
+    def __init__(self, expressions: List[CronExpression], max_catch_up: int = 1):
+        self.expressions = expressions
+        self.max_catch_up = max_catch_up
+
+    @classmethod
+    def from_config(cls, schedule: Dict) -> 'Schedule':
+        """Build a schedule from the config.json `schedule` section
+
+        Accepts the legacy named slots ({"morning_time": "11:40", ...}), a
+        `times` list of HH:MM slots and a `cron` list of cron expressions.
+        """
+        schedule = schedule or {}
+        times = [value for key, value in schedule.items() if key not in RESERVED_KEYS]
+        times += list(schedule.get('times', []))
+        crons = list(schedule.get('cron', []))
+        if not times and not crons:
+            times = list(DEFAULT_TIMES)
+
+        expressions = []
+        for value in times:
+            try:
+                expressions.append(CronExpression.from_time(str(value)))
+            except ValueError:
+                logger.warning(f"Ignoring invalid schedule time: {value}")
+        for value in crons:
+            try:
+                expressions.append(CronExpression(value))
+            except ValueError as e:
+                logger.warning(f"Ignoring invalid cron expression: {e}")
+        return cls(expressions, max(0, int(schedule.get('max_catch_up', 1))))
+
+    def next_fire(self, after: datetime.datetime) -> datetime.datetime:
+        """Return the earliest fire time strictly after `after`"""
+        candidates = [fire for fire in (expr.next_after(after) for expr in self.expressions) if fire]
+        return min(candidates) if candidates else None
+
+    def fires_between(self, start: datetime.datetime, end: datetime.datetime) -> List[datetime.datetime]:
+        """Return every fire time in the half-open interval (start, end]"""
+        fires = []
+        fire = self.next_fire(start)
+        while fire and fire <= end:
+            fires.append(fire)
+            fire = self.next_fire(fire)
+        return fires
+
+    def runs_for(self, due: List[datetime.datetime], now: datetime.datetime) -> List[datetime.datetime]:
+        """Pick the slots to run out of the due ones
+
+        A slot within ON_TIME_GRACE of now always runs; of the missed slots
+        before it only the most recent max_catch_up run, so 0 means no
+        catch-up rather than no runs at all.
+        """
+        on_time = [due[-1]] if due and due[-1] >= now - ON_TIME_GRACE else []
+        missed = due[:len(due) - len(on_time)]
+        return (missed[-self.max_catch_up:] if self.max_catch_up else []) + on_time
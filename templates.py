@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+"""
+Precompiled code templates for Auto Code Generator
+Templates are parsed once into a format string plus typed slots, then rendered
+from batches of pre-drawn random values
+"""
+
+import re
+import random
+import hashlib
+from typing import Dict, Iterator, List, Sequence
+
+# ${slot} or ${slot.field}; $$ is a literal dollar sign
+PLACEHOLDER = re.compile(r'\$\$|\$\{(\w+)(?:\.(\w+))?\}')
+
+
+class IntSlot:
+    """Uniform random integer in [low, high], stored pre-formatted"""
+
+    def __init__(self, low: int, high: int):
+        self.low = low
+        self.high = high
+        self.values = [str(value) for value in range(low, high + 1)]
+        self.fields = ()
+
+    def draw(self, rng, count: int) -> List[str]:
+        """Draw count values in one call"""
+        return rng.choices(self.values, k=count)
+
+
+class ChoiceSlot:
+    """Uniform choice among options
+
+    Options are plain strings, or tuples of named fields when `fields` is given.
+    """
+
+    def __init__(self, options: Sequence, fields: Sequence[str] = ()):
+        self.fields = tuple(fields)
+        if self.fields:
+            self.values = [tuple(option) for option in options]
+            for option in self.values:
+                if len(option) != len(self.fields):
+                    raise ValueError(f"option {option!r} does not match fields {self.fields}")
+        else:
+            self.values = [str(option) for option in options]
+
+    def draw(self, rng, count: int) -> List:
+        """Draw count options in one call"""
+        return rng.choices(self.values, k=count)
+
+
+class Template:
+    """A template compiled into a %-format string and a placeholder plan
+
+    `${now}` is filled with the render timestamp and `${index}` with the
+    position of the file in its batch (counting from `start`); every other
+    placeholder names a slot (and optionally one of its fields). A slot
+    referenced several times is drawn once per rendered file.
+    """
+
+    def __init__(self, language: str, source: str, slots: Dict[str, object]):
+        self.language = language
+        self.slots = dict(slots)
+        self.slot_names = list(self.slots)
+        self.plan = []
+        parts = []
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            parts.append(source[position:match.start()].replace('%', '%%'))
+            position = match.end()
+            if match.group(0) == '$$':
+                parts.append('$')
+                continue
+            name, field = match.group(1), match.group(2)
+            if name == 'now':
+                self.plan.append((None, None))
+            elif name == 'index':
+                self.plan.append((-1, None))
+            elif name not in self.slots:
+                raise ValueError(f"{language} template references unknown slot {name!r}")
+            else:
+                slot = self.slots[name]
+                if field is not None and field not in slot.fields:
+                    raise ValueError(f"{language} template references unknown field {name}.{field}")
+                if field is None and slot.fields:
+                    raise ValueError(f"{language} template must pick a field of {name!r}")
+                index = slot.fields.index(field) if field is not None else None
+                self.plan.append((self.slot_names.index(name), index))
+            parts.append('%s')
+        parts.append(source[position:].replace('%', '%%'))
+        self.format = ''.join(parts)
+        # Distinct code shapes (numbers aside) the template can render
+        self.shapes = 1
+        for slot in self.slots.values():
+            if isinstance(slot, ChoiceSlot):
+                self.shapes *= len(slot.values)
+        # Identifies this version of the template (source and slot values)
+        digest = hashlib.blake2b(source.encode('utf-8'), digest_size=6)
+        for name in self.slot_names:
+            digest.update(repr((name, self.slots[name].values)).encode('utf-8'))
+        self.signature = f"{language}-{digest.hexdigest()}"
+
+    def draw(self, rng, count: int) -> List[List]:
+        """Pre-draw count values for every slot, one column per slot"""
+        return [self.slots[name].draw(rng, count) for name in self.slot_names]
+
+    def render_batch(self, count: int, rng=random, now=None, start: int = 0) -> List[str]:
+        """Render count files from one batch of pre-drawn values"""
+        columns = self.draw(rng, count)
+        stamp = [str(now)] * count
+        placeholders = []
+        for slot_index, field_index in self.plan:
+            if slot_index is None:
+                placeholders.append(stamp)
+            elif slot_index < 0:
+                placeholders.append([str(index) for index in range(start, start + count)])
+            elif field_index is None:
+                placeholders.append(columns[slot_index])
+            else:
+                placeholders.append([value[field_index] for value in columns[slot_index]])
+        fmt = self.format
+        return [fmt % row for row in zip(*placeholders)] if placeholders else [fmt] * count
+
+    def render(self, rng=random, now=None) -> str:
+        """Render a single file"""
+        return self.render_batch(1, rng, now)[0]
+
+
+class StreamTemplate:
+    """A large file rendered as a head, repeated units and a tail
+
+    Units are numbered through `${index}` so their names never clash, and
+    are rendered a batch at a time and yielded in chunks of about
+    chunk_size characters, so memory stays flat however large the file.
+    With group_size, every group_size units are wrapped in group_open
+    (numbered through `${index}` as well) and group_close, for languages
+    that limit how much one scope may hold.
+    """
+
+    def __init__(self, head: Template, unit: Template, tail: Template, batch_size: int = 256,
+                 group_open: Template = None, group_close: str = '', group_size: int = 0):
+        self.language = head.language
+        self.signature = unit.signature
+        self.head = head
+        self.unit = unit
+        self.tail = tail
+        self.batch_size = batch_size
+        self.group_open = group_open
+        self.group_close = group_close
+        self.group_size = group_size if group_open is not None else 0
+
+    def iter_render(self, target_size: int, rng=random, now=None,
+                    chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """Yield a file of about target_size characters (at least one unit) in chunks"""
+        head = self.head.render(rng, now)
+        tail = self.tail.render(rng, now)
+        budget = target_size - len(head) - len(tail)
+        yield head
+        index = 0
+        written = 0
+        buffer = []
+        buffered = 0
+        while True:
+            for unit in self.unit.render_batch(self.batch_size, rng, now, start=index):
+                if index and written + buffered + len(unit) > budget:
+                    break
+                if self.group_size and index % self.group_size == 0:
+                    opener = self.group_open.render_batch(1, rng, now, start=index // self.group_size)[0]
+                    unit = (self.group_close if index else '') + opener + unit
+                buffer.append(unit)
+                buffered += len(unit)
+                index += 1
+                if buffered >= chunk_size:
+                    yield ''.join(buffer)
+                    written += buffered
+                    buffer = []
+                    buffered = 0
+            else:
+                continue
+            break
+        if self.group_size:
+            buffer.append(self.group_close)
+        if buffer:
+            yield ''.join(buffer)
+        yield tail
+
+
+def call_name(signature: str) -> str:
+    """Extract the callable name from a function or method signature
+
+    The name is the identifier right before the parameter list, after any
+    keyword, modifiers or return type ("public int processData(int input)").
+    """
+    return signature.split('(')[0].split()[-1]
+
+
+def signature_slot(signatures: Sequence[str]) -> ChoiceSlot:
+    """Choice of signatures, exposing `.signature` and `.name` fields"""
+    return ChoiceSlot([(sig, call_name(sig)) for sig in signatures], ('signature', 'name'))
+
+
+PYTHON_TEMPLATE = Template('python', '''#!/usr/bin/env python3
+# Auto-generated code at ${now}
+
+${function.signature}
+    """Auto-generated function"""
+    # Random implementation
+    result = ${start}
+    for i in range(${loops}):
+        result += ${step}
+    return result
+
+# Test the function
+if __name__ == "__main__":
+    test_result = ${function.name}(${argument})
+    print(f"Result: {test_result}")
+''', {
+    'function': signature_slot([
+        "def calculate_fibonacci(n):",
+        "def binary_search(arr, target):",
+        "def bubble_sort(data):",
+        "def merge_sort(arr):",
+        "def quick_sort(arr):",
+        "def factorial(n):",
+        "def is_prime(num):",
+        "def reverse_string(text):",
+        "def count_vowels(text):",
+        "def find_max(arr):",
+    ]),
+    'start': IntSlot(1, 100),
+    'loops': IntSlot(1, 10),
+    'step': IntSlot(1, 50),
+    'argument': IntSlot(1, 20),
+})
+
+JAVASCRIPT_TEMPLATE = Template('javascript', '''// Auto-generated JavaScript code at ${now}
+
+${function.signature} {
+    // Auto-generated function
+    const randomNumber = ${number};
+    const multiplier = ${multiplier};
+    
+    return randomNumber * multiplier;
+}
+
+// Test the function
+console.log("Auto-generated result:", ${function.name}(${argument}));
+''', {
+    'function': signature_slot([
+        "function calculateSum(a, b)",
+        "function findAverage(numbers)",
+        "function reverseArray(arr)",
+        "function capitalizeWords(str)",
+        "function countOccurrences(arr, target)",
+        "function generateRandomString(length)",
+        "function validateEmail(email)",
+        "function shuffleArray(arr)",
+        "function findLongestWord(str)",
+        "function isPalindrome(str)",
+    ]),
+    'number': IntSlot(1, 100),
+    'multiplier': IntSlot(1, 10),
+    'argument': IntSlot(1, 20),
+})
+
+CPP_TEMPLATE = Template('cpp', '''// Auto-generated C++ code at ${now}
+#include <iostream>
+#include <vector>
+#include <algorithm>
+
+${function.signature} {
+    // Auto-generated function
+    int result = ${start};
+    for (int i = 0; i < ${loops}; i++) {
+        result += ${step};
+    }
+    return result;
+}
+
+int main() {
+    // Test the function
+    auto result = ${function.name}(${argument});
+    std::cout << "Auto-generated result: " << result << std::endl;
+    return 0;
+}
+''', {
+    'function': signature_slot([
+        "int calculatePower(int base, int exponent)",
+        "int findGCD(int a, int b)",
+        "bool isEven(int number)",
+        "int sumArray(int arr[], int size)",
+        "int findMax(int arr[], int size)",
+        "void printPattern(int n)",
+        "int factorial(int n)",
+        "bool isPalindrome(int num)",
+        "int countDigits(int num)",
+        "int reverseNumber(int num)",
+    ]),
+    'start': IntSlot(1, 100),
+    'loops': IntSlot(1, 10),
+    'step': IntSlot(1, 50),
+    'argument': IntSlot(1, 20),
+})
+
+JAVA_TEMPLATE = Template('java', '''// Auto-generated Java code at ${now}
+public class ${class_name} {
+    
+    ${method.signature} {
+        // Auto-generated method
+        int result = ${start};
+        for (int i = 0; i < ${loops}; i++) {
+            result += ${step};
+        }
+        return result;
+    }
+    
+    public static void main(String[] args) {
+        ${class_name} instance = new ${class_name}();
+        System.out.println("Auto-generated result: " + 
+                          instance.${method.name}(${argument}));
+    }
+}
+''', {
+    'class_name': ChoiceSlot([
+        "Calculator",
+        "StringProcessor",
+        "NumberUtils",
+        "ArrayHelper",
+        "MathOperations",
+        "DataValidator",
+        "TextAnalyzer",
+        "RandomGenerator",
+        "SortingUtils",
+        "SearchAlgorithms",
+    ]),
+    'method': signature_slot([
+        "public int processData(int input)",
+        "public String manipulateText(String text)",
+        "public boolean validateInput(String input)",
+        "public int calculateResult(int a, int b)",
+        "public void printResults()",
+    ]),
+    'start': IntSlot(1, 100),
+    'loops': IntSlot(1, 10),
+    'step': IntSlot(1, 50),
+    'argument': IntSlot(1, 20),
+})
+
+HTML_TEMPLATE = Template('html', '''<!DOCTYPE html>
+<!-- Auto-generated HTML at ${now} -->
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Auto-Generated Page</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            background-color: ${color};
+            margin: 0;
+            padding: 20px;
+        }
+        .container {
+            max-width: 800px;
+            margin: 0 auto;
+            background: white;
+            padding: 20px;
+            border-radius: 10px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: ${color};
+            text-align: center;
+        }
+        .random-number {
+            font-size: 24px;
+            font-weight: bold;
+            text-align: center;
+            margin: 20px 0;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Auto-Generated HTML Page</h1>
+        <p>This page was automatically generated at ${now}.</p>
+        <div class="random-number">Random Number: ${number}</div>
+        <p>Generated with love by the Auto Code Generator!</p>
+    </div>
+</body>
+</html>''', {
+    'color': ChoiceSlot(['red', 'blue', 'green', 'purple', 'orange', 'pink', 'yellow', 'teal']),
+    'number': IntSlot(1, 1000),
+})
+
+# Compiled templates by language name
+TEMPLATES = {
+    template.language: template
+    for template in (PYTHON_TEMPLATE, JAVASCRIPT_TEMPLATE, CPP_TEMPLATE, JAVA_TEMPLATE, HTML_TEMPLATE)
+}
+
+
+PYTHON_STREAM = StreamTemplate(
+    Template('python', '#!/usr/bin/env python3\n# Auto-generated code at ${now}\n\n', {}),
+    Template('python', '''
+def generated_${index}(n):
+    """Auto-generated ${name} variant"""
+    result = ${start}
+    for i in range(${loops}):
+        result += ${step}
+    return result + n
+
+''', {
+        'name': ChoiceSlot(['fibonacci', 'binary_search', 'bubble_sort', 'merge_sort', 'factorial',
+                            'is_prime', 'reverse_string', 'count_vowels', 'find_max']),
+        'start': IntSlot(1, 100),
+        'loops': IntSlot(1, 10),
+        'step': IntSlot(1, 50),
+    }),
+    Template('python', '''
+if __name__ == "__main__":
+    print(f"Result: {generated_0(${argument})}")
+''', {'argument': IntSlot(1, 20)}),
+)
+
+JAVASCRIPT_STREAM = StreamTemplate(
+    Template('javascript', '// Auto-generated JavaScript code at ${now}\n', {}),
+    Template('javascript', '''
+// Auto-generated ${name} variant
+function generated${index}(n) {
+    const randomNumber = ${number};
+    const multiplier = ${multiplier};
+    return randomNumber * multiplier + n;
+}
+''', {
+        'name': ChoiceSlot(['calculateSum', 'findAverage', 'reverseArray', 'capitalizeWords',
+                            'shuffleArray', 'findLongestWord', 'isPalindrome']),
+        'number': IntSlot(1, 100),
+        'multiplier': IntSlot(1, 10),
+    }),
+    Template('javascript', '''
+console.log("Auto-generated result:", generated0(${argument}));
+''', {'argument': IntSlot(1, 20)}),
+)
+
+CPP_STREAM = StreamTemplate(
+    Template('cpp', '// Auto-generated C++ code at ${now}\n#include <iostream>\n', {}),
+    Template('cpp', '''
+// Auto-generated ${name} variant
+int generated${index}(int n) {
+    int result = ${start};
+    for (int i = 0; i < ${loops}; i++) {
+        result += ${step};
+    }
+    return result + n;
+}
+''', {
+        'name': ChoiceSlot(['calculatePower', 'findGCD', 'sumArray', 'findMax', 'factorial',
+                            'countDigits', 'reverseNumber']),
+        'start': IntSlot(1, 100),
+        'loops': IntSlot(1, 10),
+        'step': IntSlot(1, 50),
+    }),
+    Template('cpp', '''
+int main() {
+    std::cout << "Auto-generated result: " << generated0(${argument}) << std::endl;
+    return 0;
+}
+''', {'argument': IntSlot(1, 20)}),
+)
+
+JAVA_STREAM = StreamTemplate(
+    Template('java', '// Auto-generated Java code at ${now}\npublic class ${class_name} {\n', {
+        'class_name': JAVA_TEMPLATE.slots['class_name'],
+    }),
+    Template('java', '''
+        // Auto-generated ${name} variant
+        public static int generated${index}(int n) {
+            int result = ${start};
+            for (int i = 0; i < ${loops}; i++) {
+                result += ${step};
+            }
+            return result + n;
+        }
+''', {
+        'name': ChoiceSlot(['processData', 'calculateResult', 'countWords', 'sumValues']),
+        'start': IntSlot(1, 100),
+        'loops': IntSlot(1, 10),
+        'step': IntSlot(1, 50),
+    }),
+    Template('java', '''
+    public static void main(String[] args) {
+        System.out.println("Auto-generated result: " + Part0.generated0(${argument}));
+    }
+}
+''', {'argument': IntSlot(1, 20)}),
+    # A class file holds at most 65535 methods and constant pool entries
+    group_open=Template('java', '\n    static class Part${index} {\n', {}),
+    group_close='    }\n',
+    group_size=1000,
+)
+
+HTML_STREAM = StreamTemplate(
+    Template('html', '''<!DOCTYPE html>
+<!-- Auto-generated HTML at ${now} -->
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Auto-Generated Page</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }
+        .random-number { font-size: 24px; font-weight: bold; margin: 20px 0; }
+    </style>
+</head>
+<body>
+    <h1>Auto-Generated HTML Page</h1>
+''', {}),
+    Template('html', '''    <div class="random-number" id="number-${index}" style="color: ${color}">Random Number: ${number}</div>
+''', {
+        'color': HTML_TEMPLATE.slots['color'],
+        'number': IntSlot(1, 1000),
+    }),
+    Template('html', '''    <p>Generated with love by the Auto Code Generator!</p>
+</body>
+</html>''', {}),
+)
+
+# Streamed (large file) templates by language name
+STREAM_TEMPLATES = {
+    stream.language: stream
+    for stream in (PYTHON_STREAM, JAVASCRIPT_STREAM, CPP_STREAM, JAVA_STREAM, HTML_STREAM)
+}
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import atomic_files
+from atomic_files import WriteBatch, write_atomic
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if '.tmp' in name]
+
+
+@pytest.mark.parametrize('fsync', [False, True])
+def test_write_atomic_replaces_the_file(tmp_path, fsync):
+    path = tmp_path / 'out.txt'
+    path.write_text('old')
+    write_atomic(str(path), 'new', fsync=fsync)
+    assert path.read_text() == 'new'
+    write_atomic(str(path), iter(['chunked ', 'content']), fsync=fsync)
+    assert path.read_text() == 'chunked content'
+    assert leftovers(tmp_path) == []
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('old')
+
+    def chunks():
+        yield 'partial'
+        raise RuntimeError('render failed')
+
+    with pytest.raises(RuntimeError):
+        write_atomic(str(path), chunks())
+    assert path.read_text() == 'old'
+    assert leftovers(tmp_path) == []
+
+
+@pytest.mark.parametrize('durability', ['none', 'batch'])
+def test_batch_files_appear_only_on_commit(tmp_path, durability):
+    batch = WriteBatch(durability)
+    for index in range(3):
+        batch.write(str(tmp_path / f"f{index}"), f"file {index}")
+    assert sorted(os.listdir(tmp_path)) == sorted(leftovers(tmp_path))
+    batch.commit()
+    assert sorted(os.listdir(tmp_path)) == ['f0', 'f1', 'f2']
+    assert (tmp_path / 'f2').read_text() == 'file 2'
+
+
+def test_batch_aborts_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with WriteBatch() as batch:
+            batch.write(str(tmp_path / 'kept'), 'data')
+            raise RuntimeError('burst failed')
+    assert os.listdir(tmp_path) == []
+
+
+def test_batch_flushes_the_device_once(tmp_path, monkeypatch):
+    calls = []
+
+    class FakeFcntl:
+        F_FULLFSYNC = 51
+
+        @staticmethod
+        def fcntl(fd, operation):
+            calls.append(operation)
+
+    monkeypatch.setattr(atomic_files, 'fcntl', FakeFcntl)
+    with WriteBatch('batch') as batch:
+        for index in range(5):
+            batch.write(str(tmp_path / f"f{index}"), 'data')
+    assert calls == [FakeFcntl.F_FULLFSYNC]
+    write_atomic(str(tmp_path / 'single'), 'data', fsync=True)
+    assert len(calls) == 2
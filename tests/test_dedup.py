@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from dedup import DedupIndex, hash_chunks, normalized_hash
+
+CODE = "// Auto-generated C++ code at {}\nint main() {{ return {}; }}\n"
+
+
+def test_add_reports_repeats_ignoring_timestamps(tmp_path):
+    index = DedupIndex(str(tmp_path / 'dedup.bloom'), capacity=1000)
+    assert index.add(CODE.format('2025-01-01 09:00:00.123456', 1))
+    assert not index.add(CODE.format('2025-06-30 21:00:00', 1))
+    assert index.add(CODE.format('2025-01-01 09:00:00.123456', 2))
+    assert index.count == 2
+
+
+def test_index_persists_across_reopen(tmp_path):
+    path = str(tmp_path / 'dedup.bloom')
+    index = DedupIndex(path, capacity=1000)
+    for value in range(100):
+        index.add(CODE.format('2025-01-01 09:00:00', value))
+    index.close()
+
+    reopened = DedupIndex(path, capacity=1000)
+    assert reopened.count == 100
+    assert not any(reopened.add(CODE.format('2025-02-01 21:00:00', value)) for value in range(100))
+
+
+def test_false_positive_rate_is_near_the_target(tmp_path):
+    index = DedupIndex(str(tmp_path / 'dedup.bloom'), capacity=10_000, error_rate=0.01)
+    for value in range(10_000):
+        index.add(f"seen {value}")
+    # Probing adds too, so keep the probes few enough not to overfill the filter
+    false_positives = sum(not index.add(f"fresh {value}") for value in range(1000))
+    assert false_positives < 1000 * 0.025
+
+
+def test_rebuild_replaces_the_contents(tmp_path):
+    path = str(tmp_path / 'dedup.bloom')
+    index = DedupIndex(path, capacity=1000)
+    index.add('old')
+    index.close()
+    rebuilt = DedupIndex.rebuild(path, ['new'], 1000, 0.001)
+    assert rebuilt.add('old')
+    assert not rebuilt.add('new')
+    assert not os.path.exists(f"{path}.rebuild")
+
+
+def test_rejects_a_foreign_file(tmp_path):
+    path = tmp_path / 'dedup.bloom'
+    path.write_bytes(b'x' * 4096)
+    with pytest.raises(ValueError):
+        DedupIndex(str(path))
+
+
+def test_hash_chunks_matches_normalized_hash():
+    import hashlib
+    lines = [CODE.format('2025-01-01 09:00:00', value) for value in range(50)]
+    code = ''.join(lines)
+    digest = hashlib.blake2b(digest_size=16)
+    # Timestamps never straddle a chunk boundary, as in streamed files
+    chunks = [''.join(lines[:1]), ''.join(lines[1:20]), ''.join(lines[20:])]
+    assert ''.join(hash_chunks(chunks, digest)) == code
+    assert digest.digest() == normalized_hash(code)
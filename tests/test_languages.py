@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from languages import AliasTable, LanguageRegistry, detect_language, render_random
+
+
+@pytest.mark.parametrize('weights', [[1, 1, 1], [30, 25, 20, 15, 10], [0.5, 0, 9.5], [1]])
+def test_alias_table_matches_the_weights(weights):
+    table = AliasTable(weights)
+    draws = 200_000
+    counts = Counter(table.sample_many(draws, random.Random(7)))
+    total = sum(weights)
+    for index, weight in enumerate(weights):
+        assert abs(counts[index] / draws - weight / total) < 0.005
+    assert set(counts) <= {index for index, weight in enumerate(weights) if weight > 0}
+
+
+def test_alias_table_single_and_batch_draws_agree():
+    table = AliasTable([3, 1, 6])
+    single = [table.sample(random.Random(seed)) for seed in range(200)]
+    batch = [table.sample_many(1, random.Random(seed))[0] for seed in range(200)]
+    assert single == batch
+
+
+@pytest.mark.parametrize('weights', [[], [0, 0]])
+def test_alias_table_needs_a_positive_weight(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_registry_from_config_skips_disabled_and_unknown_types():
+    registry = LanguageRegistry.from_config([
+        {'extension': '.py', 'weight': 3},
+        {'extension': '.java', 'weight': 0},
+        {'extension': '.rs', 'weight': 5},
+        {'extension': '.js', 'weight': 1},
+    ])
+    assert registry.weights == {'python': 3.0, 'javascript': 1.0}
+    drawn = Counter(language.name for language in registry.sample_many(40_000, random.Random(1)))
+    assert set(drawn) == {'python', 'javascript'}
+    assert abs(drawn['python'] / 40_000 - 0.75) < 0.01
+
+
+def test_registry_falls_back_to_equal_weights():
+    registry = LanguageRegistry.from_config([{'extension': '.py', 'weight': 0}])
+    assert set(registry.weights.values()) == {1.0}
+    assert len(registry.weights) == 5
+
+
+def test_rendered_files_match_their_language():
+    for language, code in render_random(200, random.Random(3), 'now'):
+        assert detect_language(code) is language
@@ -0,0 +1,38 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from parallel_gen import CHUNK_SIZE, chunk_tasks, derive_seed, iter_rendered
+
+NOW = datetime(2024, 1, 2, 3, 4, 5)
+WEIGHTS = {'python': 3.0, 'javascript': 2.0, 'java': 1.0, 'cpp': 1.0, 'html': 1.0}
+
+
+def render(seed, workers, count=CHUNK_SIZE * 2 + 100):
+    tasks = chunk_tasks(seed, 1, count, NOW, WEIGHTS)
+    return [(language.name, code) for chunk in iter_rendered(tasks, workers) for language, code in chunk]
+
+
+def test_chunks_have_a_fixed_size():
+    tasks = chunk_tasks(7, 1, CHUNK_SIZE * 2 + 100, NOW, WEIGHTS)
+    assert [count for _, count, _, _ in tasks] == [CHUNK_SIZE, CHUNK_SIZE, 100]
+    assert len({seed for seed, _, _, _ in tasks}) == 3
+
+
+def test_derived_seeds_are_stable():
+    assert derive_seed(7, 1, 0) == derive_seed(7, 1, 0)
+    assert derive_seed(7, 1, 0) != derive_seed(7, 1, 1)
+    assert derive_seed(7, 1, 0) != derive_seed(8, 1, 0)
+
+
+def test_output_does_not_depend_on_worker_count():
+    single = render(42, 1)
+    assert len(single) == CHUNK_SIZE * 2 + 100
+    assert render(42, 3) == single
+
+
+def test_same_seed_reproduces_and_other_seeds_differ():
+    assert render(42, 1, 200) == render(42, 1, 200)
+    assert render(42, 1, 200) != render(43, 1, 200)
@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from push_queue import PushQueue
+
+
+def make_queue(tmp_path, remotes=('origin', 'mirror')):
+    return PushQueue(str(tmp_path / 'state' / 'push_queue.json'), list(remotes), 30, 3600)
+
+
+def test_queue_survives_a_restart(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue('a' * 40, now=100)
+    queue.enqueue('b' * 40, now=200)
+    queue.ack('origin', 'a' * 40, now=300)
+    queue.fail('mirror', 'fatal: unreachable', now=300)
+
+    reloaded = make_queue(tmp_path)
+    assert reloaded.entries == queue.entries
+    assert reloaded.depth('origin') == 1
+    assert reloaded.depth('mirror') == 2
+    assert reloaded.tip('mirror') == 'b' * 40
+    assert reloaded.status['mirror']['failures'] == 1
+    assert reloaded.status['mirror']['last_error'] == 'fatal: unreachable'
+    assert reloaded.status['origin']['last_success'] == 300
+
+
+def test_reload_forgets_removed_remotes(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue('a' * 40)
+    reloaded = make_queue(tmp_path, ['origin', 'backup'])
+    assert reloaded.entries[0]['pending'] == ['origin']
+    assert reloaded.status['backup']['failures'] == 0
+    assert reloaded.depth('backup') == 0
+
+
+def test_one_push_acks_every_queued_commit(tmp_path):
+    queue = make_queue(tmp_path, ['origin'])
+    for sha in ('a', 'b', 'c'):
+        queue.enqueue(sha * 40)
+    pushes = []
+
+    def push(remotes):
+        pushes.append((list(remotes), queue.tip('origin')))
+        return {remote: (True, 'ok') for remote in remotes}
+
+    delivered = []
+    queue.on_delivered = delivered.extend
+    assert queue.flush(push)
+    assert pushes == [(['origin'], 'c' * 40)]
+    assert queue.depth() == 0
+    assert delivered == ['a' * 40, 'b' * 40, 'c' * 40]
+
+
+def test_failures_back_off_exponentially_up_to_the_cap(tmp_path):
+    queue = make_queue(tmp_path, ['origin'])
+    queue.enqueue('a' * 40)
+    delays = [queue.fail('origin', 'error', now=1000) for _ in range(9)]
+    assert delays[:4] == [30, 60, 120, 240]
+    assert delays[-1] == 3600
+    assert queue.next_attempt() == 4600
+    assert queue.due_remotes(now=4599) == []
+    assert queue.due_remotes(now=4600) == ['origin']
+    assert queue.due_remotes(now=1000, force=True) == ['origin']
+
+
+def test_failed_flush_keeps_commits_and_success_resets_backoff(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue('a' * 40)
+    assert not queue.flush(lambda remotes: {'origin': (True, 'ok'), 'mirror': (False, 'timed out')})
+    assert queue.depth('origin') == 0
+    assert queue.depth('mirror') == 1
+    assert queue.status['mirror']['failures'] == 1
+
+    assert queue.flush(lambda remotes: {remote: (True, 'ok') for remote in remotes}, force=True)
+    assert queue.depth() == 0
+    assert queue.status['mirror']['failures'] == 0
+    assert queue.next_attempt() is None
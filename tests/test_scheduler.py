@@ -0,0 +1,100 @@
+import datetime
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from auto_code_generator import AutoCodeGenerator
+from scheduler import CronExpression, Schedule
+
+
+def at(text: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(text)
+
+
+def due_triggers(schedule: Schedule, last_fire: datetime.datetime, now: datetime.datetime):
+    return AutoCodeGenerator.due_triggers(types.SimpleNamespace(schedule=schedule), last_fire, now)
+
+
+def test_cron_fields():
+    expression = CronExpression('*/15 9-11 * * 1-5')
+    assert expression.minutes == [0, 15, 30, 45]
+    assert expression.hours == [9, 10, 11]
+    assert expression.weekdays == {1, 2, 3, 4, 5}
+
+
+@pytest.mark.parametrize('expression', ['* * * *', '60 * * * *', '* 24 * * *', '*/0 * * * *', '5-1 * * * *'])
+def test_cron_rejects_invalid(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+def test_cron_next_after_is_strict():
+    expression = CronExpression.from_time('09:00')
+    assert expression.next_after(at('2025-03-03 08:59:30')) == at('2025-03-03 09:00')
+    assert expression.next_after(at('2025-03-03 09:00')) == at('2025-03-04 09:00')
+
+
+def test_cron_day_of_month_or_weekday():
+    # The 13th or any Friday, as in cron
+    expression = CronExpression('0 0 13 * 5')
+    assert expression.next_after(at('2025-06-01 00:00')) == at('2025-06-06 00:00')
+    assert expression.next_after(at('2025-06-07 00:00')) == at('2025-06-13 00:00')
+
+
+def test_cron_sunday_is_0_and_7():
+    assert CronExpression('0 0 * * 7').weekdays == CronExpression('0 0 * * 0').weekdays == {0}
+    assert CronExpression('0 0 * * 0').next_after(at('2025-06-02 00:00')) == at('2025-06-08 00:00')
+
+
+def test_cron_leap_day():
+    assert CronExpression('0 12 29 2 *').next_after(at('2025-03-01 00:00')) == at('2028-02-29 12:00')
+
+
+def test_schedule_from_config():
+    schedule = Schedule.from_config({'morning_time': '09:00', 'times': ['21:00', 'bad'],
+                                     'cron': ['0 12 * * 6', 'nonsense'], 'max_catch_up': 3})
+    assert [expression.expression for expression in schedule.expressions] == \
+        ['0 9 * * *', '0 21 * * *', '0 12 * * 6']
+    assert schedule.max_catch_up == 3
+    assert len(Schedule.from_config(None).expressions) == 2
+
+
+def test_fires_between_is_half_open():
+    schedule = Schedule.from_config({'times': ['09:00', '21:00']})
+    assert schedule.fires_between(at('2025-03-03 09:00'), at('2025-03-04 09:00')) == \
+        [at('2025-03-03 21:00'), at('2025-03-04 09:00')]
+
+
+@pytest.mark.parametrize('max_catch_up', [0, 1, 3])
+def test_due_slot_runs_on_time(max_catch_up):
+    schedule = Schedule.from_config({'times': ['09:00'], 'max_catch_up': max_catch_up})
+    due, runs = due_triggers(schedule, at('2025-03-02 09:00'), at('2025-03-03 09:00:02'))
+    assert due == runs == [at('2025-03-03 09:00')]
+
+
+@pytest.mark.parametrize('max_catch_up, runs', [
+    (0, []),
+    (1, ['2025-03-05 09:00']),
+    (2, ['2025-03-04 09:00', '2025-03-05 09:00']),
+])
+def test_missed_slots_are_capped(max_catch_up, runs):
+    schedule = Schedule.from_config({'times': ['09:00'], 'max_catch_up': max_catch_up})
+    due, actual = due_triggers(schedule, at('2025-03-02 09:00'), at('2025-03-05 18:00'))
+    assert len(due) == 3
+    assert actual == [at(run) for run in runs]
+
+
+def test_catch_up_does_not_crowd_out_the_slot_due_now():
+    schedule = Schedule.from_config({'times': ['09:00', '21:00'], 'max_catch_up': 1})
+    due, runs = due_triggers(schedule, at('2025-03-02 09:00'), at('2025-03-03 21:00:05'))
+    assert runs == [at('2025-03-03 09:00'), at('2025-03-03 21:00')]
+    assert len(due) == 3
+
+
+def test_nothing_due():
+    schedule = Schedule.from_config({'times': ['09:00'], 'max_catch_up': 0})
+    assert due_triggers(schedule, at('2025-03-03 09:00'), at('2025-03-03 10:00')) == ([], [])
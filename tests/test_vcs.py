@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from vcs import MemoryBackend, PlumbingBackend, SubprocessBackend, create_backend, push_error
+
+needs_git = pytest.mark.skipif(shutil.which('git') is None, reason="git is not installed")
+
+
+def git(repo, *args):
+    return subprocess.run(['git', *args], cwd=repo, capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = tmp_path / 'repo'
+    path.mkdir()
+    git(path, 'init', '-q', '-b', 'main')
+    return path
+
+
+def write(repo, name, text):
+    (repo / name).write_text(text)
+
+
+@needs_git
+@pytest.mark.parametrize('backend_class', [SubprocessBackend, PlumbingBackend])
+def test_git_backends_commit_and_remove(repo, backend_class):
+    backend = backend_class(str(repo), 'main')
+    assert backend.configure_identity('Test', 'test@example.com')
+    write(repo, 'a.py', 'a = 1\n')
+    write(repo, 'b.js', 'let b = 2;\n')
+    assert backend.add(['a.py', 'b.js'])
+    assert backend.commit('first')
+    assert backend.head() == git(repo, 'rev-parse', 'HEAD')
+    assert git(repo, 'ls-tree', '--name-only', 'HEAD').split() == ['a.py', 'b.js']
+
+    os.remove(repo / 'a.py')
+    if backend_class is PlumbingBackend:
+        assert not backend.add(['a.py'])
+    assert backend.add(['a.py'], include_removals=True)
+    assert backend.commit('second')
+    assert git(repo, 'ls-tree', '--name-only', 'HEAD').split() == ['b.js']
+    assert git(repo, 'log', '--format=%s').split() == ['second', 'first']
+
+
+@needs_git
+@pytest.mark.parametrize('backend_class', [SubprocessBackend, PlumbingBackend])
+def test_git_backends_refuse_empty_commits(repo, backend_class):
+    backend = backend_class(str(repo), 'main')
+    backend.configure_identity('Test', 'test@example.com')
+    write(repo, 'a.py', 'a = 1\n')
+    backend.add(['a.py'])
+    assert backend.commit('first')
+    backend.add(['a.py'])
+    assert not backend.commit('nothing new')
+
+
+@needs_git
+def test_plumbing_follows_a_branch_moved_behind_its_back(repo):
+    plumbing = PlumbingBackend(str(repo), 'main')
+    plumbing.configure_identity('Test', 'test@example.com')
+    write(repo, 'a.py', 'a = 1\n')
+    plumbing.add(['a.py'])
+    assert plumbing.commit('first')
+
+    write(repo, 'b.py', 'b = 2\n')
+    git(repo, 'add', 'b.py')
+    git(repo, 'commit', '-q', '-m', 'outside')
+    outside = git(repo, 'rev-parse', 'HEAD')
+
+    write(repo, 'c.py', 'c = 3\n')
+    plumbing.add(['c.py'])
+    assert plumbing.commit('third')
+    assert git(repo, 'rev-parse', 'HEAD^') == outside
+    assert git(repo, 'ls-tree', '--name-only', 'HEAD').split() == ['a.py', 'b.py', 'c.py']
+
+
+@needs_git
+def test_subprocess_push_reports_the_fatal_line(repo, tmp_path):
+    backend = SubprocessBackend(str(repo), 'main')
+    backend.configure_identity('Test', 'test@example.com')
+    write(repo, 'a.py', 'a = 1\n')
+    backend.add(['a.py'])
+    backend.commit('first')
+    remote = tmp_path / 'remote.git'
+    git(tmp_path, 'init', '-q', '--bare', str(remote))
+
+    target = {'name': 'origin', 'url': str(remote), 'branch': 'main', 'timeout': 30}
+    assert backend.push(target) == (True, 'ok')
+    assert git(remote, 'rev-parse', 'main') == backend.head()
+
+    ok, detail = backend.push({**target, 'url': str(tmp_path / 'missing.git')})
+    assert not ok
+    assert detail.startswith('fatal:')
+
+
+def test_memory_backend_commits_and_pushes(tmp_path):
+    backend = create_backend('memory', str(tmp_path))
+    assert isinstance(backend, MemoryBackend)
+    (tmp_path / 'a.py').write_text('a = 1\n')
+    assert backend.add(['a.py'])
+    assert backend.commit('first')
+    first = backend.head()
+    assert not backend.commit('nothing new')
+    assert not backend.add(['missing.py'])
+
+    (tmp_path / 'a.py').write_text('a = 2\n')
+    backend.add(['a.py'])
+    assert backend.commit('second')
+    assert backend.commits[backend.head()][0] == first
+    assert backend.push_command({'name': 'origin'}) is None
+    assert backend.push({'name': 'origin'}) == (True, 'ok')
+    assert backend.remote_tips == {'origin': backend.head()}
+
+
+def test_memory_backend_hashes_blobs_like_git(tmp_path):
+    assert MemoryBackend.object_id('blob', b'') == 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+
+
+def test_unknown_backend_falls_back_to_subprocess(tmp_path):
+    assert isinstance(create_backend('svn', str(tmp_path)), SubprocessBackend)
+
+
+def test_push_error_prefers_fatal_lines():
+    stderr = ("fatal: 'mirror' does not appear to be a git repository\n"
+              "fatal: Could not read from remote repository.\n\n"
+              "Please make sure you have the correct access rights\n"
+              "and the repository exists.\n")
+    assert push_error(stderr, 128) == "fatal: 'mirror' does not appear to be a git repository"
+    assert push_error("hint: something\n", 1) == "hint: something"
+    assert push_error("", 1) == "exit status 1"
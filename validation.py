@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Generated code validation for Auto Code Generator
+Python is parsed in-process with ast; C++, Java and JavaScript are checked by
+their toolchains when installed. Verdicts are cached by the template and the
+shape of the code, so each variant is compiled once
+"""
+
+import os
+import re
+import ast
+import json
+import shutil
+import hashlib
+import tempfile
+import subprocess
+import logging
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from atomic_files import write_atomic
+from dedup import TIMESTAMP
+from languages import Language
+
+logger = logging.getLogger(__name__)
+
+NUMBER = re.compile(r'\d+')
+JAVA_CLASS = re.compile(r'\bpublic\s+class\s+(\w+)')
+
+# Per language: command line ({file} and {dir} are filled in) and source file name
+TOOLCHAINS = {
+    'cpp': (['g++', '-fsyntax-only', '{file}'], 'check.cpp'),
+    'java': (['javac', '-proc:none', '-d', '{dir}', '{file}'], None),
+    'javascript': (['node', '--check', '{file}'], 'check.js'),
+}
+
+
+def check_python(code: str) -> Tuple[bool, str]:
+    """Parse Python source with ast"""
+    try:
+        ast.parse(code)
+        return True, 'ok'
+    except SyntaxError as e:
+        return False, f"line {e.lineno}: {e.msg}"
+
+
+class CodeValidator:
+    """Checks generated code, remembering the verdict for each code shape
+
+    The shape is the template signature plus a hash of the code with its
+    timestamp and numbers blanked out: the random integers drawn into a
+    template never decide whether it compiles, the chosen names and
+    signatures do. Verdicts are kept in a JSON file so they survive
+    --once runs. Languages without an installed toolchain are not checked.
+    """
+
+    def __init__(self, cache_file: str, workers: int = 4, timeout: float = 30):
+        self.cache_file = cache_file
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.available = {name: shutil.which(command[0]) is not None
+                          for name, (command, _) in TOOLCHAINS.items()}
+        self.cache: Dict[str, List] = {}
+        self.dirty = False
+        try:
+            with open(cache_file, 'r') as f:
+                self.cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+        # Shapes known not to compile, per template signature
+        self.invalid = Counter(key.split(':', 1)[0] for key, (ok, _) in self.cache.items() if not ok)
+        # Languages already reported as having no valid shape
+        self.abandoned = set()
+
+    @staticmethod
+    def shape(language: Language, code: str) -> str:
+        """Cache key: template signature plus the hash of the blanked-out code"""
+        skeleton = NUMBER.sub('0', TIMESTAMP.sub('', code))
+        return f"{language.template.signature}:{hashlib.blake2b(skeleton.encode('utf-8'), digest_size=8).hexdigest()}"
+
+    def exhausted(self, language: Language) -> bool:
+        """Whether every shape of the language's template is cached as invalid
+
+        Re-rendering can then never produce a valid file.
+        """
+        return self.invalid[language.template.signature] >= language.template.shapes
+
+    def checked(self, language: Language) -> bool:
+        """Whether code in this language can be validated here"""
+        return language.name == 'python' or self.available.get(language.name, False)
+
+    def run_toolchain(self, language: Language, code: str) -> Tuple[bool, str]:
+        """Compile or syntax-check code with the language's toolchain
+
+        Returns (True, 'unchecked') when the toolchain itself fails to run.
+        """
+        command, filename = TOOLCHAINS[language.name]
+        if filename is None:
+            match = JAVA_CLASS.search(code)
+            filename = f"{match.group(1) if match else 'Check'}.java"
+        with tempfile.TemporaryDirectory(prefix='autogen-check-') as directory:
+            path = os.path.join(directory, filename)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            try:
+                result = subprocess.run([part.format(file=path, dir=directory) for part in command],
+                                        capture_output=True, text=True, timeout=self.timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"Could not validate {language.name} code: {e}")
+                return True, 'unchecked'
+        if result.returncode == 0:
+            return True, 'ok'
+        output = (result.stderr or result.stdout).replace(path, filename).strip().splitlines()
+        errors = [line for line in output if 'error' in line.lower()]
+        return False, (errors or output or [f"exit status {result.returncode}"])[0]
+
+    def check(self, language: Language, code: str) -> Tuple[bool, str]:
+        """Validate one file"""
+        return self.validate([(language, code)])[0]
+
+    def validate(self, codes: List[Tuple[Language, str]]) -> List[Tuple[bool, str]]:
+        """Validate (language, code) pairs, returning (ok, detail) for each
+
+        Shapes not in the cache are checked once each, in parallel.
+        """
+        results = [None] * len(codes)
+        missing: Dict[str, Tuple[Language, str]] = {}
+        keys = [None] * len(codes)
+        for position, (language, code) in enumerate(codes):
+            if language.name == 'python':
+                results[position] = check_python(code)
+            elif not self.checked(language):
+                results[position] = (True, 'unchecked')
+            else:
+                key = keys[position] = self.shape(language, code)
+                if key not in self.cache:
+                    missing.setdefault(key, (language, code))
+
+        if missing:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                verdicts = pool.map(lambda item: self.run_toolchain(*item), missing.values())
+                for key, (ok, detail) in zip(missing, verdicts):
+                    if detail != 'unchecked':
+                        self.cache[key] = [ok, detail]
+                        self.invalid[key.split(':', 1)[0]] += not ok
+                        self.dirty = True
+
+        for position, key in enumerate(keys):
+            if key is not None:
+                results[position] = tuple(self.cache.get(key, (True, 'unchecked')))
+        return results
+
+    def save(self):
+        """Persist new verdicts"""
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            write_atomic(self.cache_file, json.dumps(self.cache))
+            self.dirty = False
+        except OSError as e:
+            logger.error(f"Error saving validation cache: {e}")
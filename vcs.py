@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Version control backends for Auto Code Generator
+The generator stages, commits and pushes through one of these, chosen by the
+`vcs_backend` config key: porcelain git commands, batched git plumbing, or an
+in-memory fake for load tests that never touch git
+"""
+
+import os
+import hashlib
+import subprocess
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def push_error(stderr: str, returncode: int) -> str:
+    """The line of a failed push's stderr worth keeping: the first fatal:/error: line
+
+    git often ends with hints ("and the repository exists.") that say
+    nothing about what went wrong; those are only used as a last resort.
+    """
+    lines = [line.strip() for line in stderr.strip().splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith(('fatal:', 'error:')):
+            return line
+    return lines[-1] if lines else f"exit status {returncode}"
+
+
+class SubprocessBackend:
+    """Porcelain git commands: `git add`, `git commit`, `git push`
+
+    The simplest backend; commits run hooks and honour every git setting.
+    """
+
+    name = 'subprocess'
+
+    def __init__(self, repo_path: str, branch: str = 'main'):
+        self.repo_path = repo_path
+        self.branch = branch
+
+    def git(self, *args: str, input: str = None, check: bool = True) -> subprocess.CompletedProcess:
+        """Run git in the repository, capturing text output"""
+        return subprocess.run(['git', *args], cwd=self.repo_path, input=input,
+                              capture_output=True, text=True, check=check)
+
+    def configure_identity(self, name: str = None, email: str = None) -> bool:
+        """Write the commit identity to the repository config"""
+        try:
+            if name:
+                self.git('config', 'user.name', name)
+            if email:
+                self.git('config', 'user.email', email)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error setting up git config: {e}")
+            return False
+
+    def add(self, paths: List[str], include_removals: bool = False) -> bool:
+        """Stage paths (relative to the repository) with a single `git add`
+
+        With include_removals, paths that no longer exist are staged as deletions.
+        """
+        options = ['--all'] if include_removals else []
+        try:
+            self.git('add', *options, '--pathspec-from-file=-', '--pathspec-file-nul',
+                     input='\0'.join(paths))
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error adding files to git: {e.stderr.strip() or e}")
+            return False
+
+    def commit(self, message: str) -> bool:
+        """Commit the staged changes"""
+        try:
+            self.git('commit', '-q', '-m', message)
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error committing to git: {(e.stdout + e.stderr).strip() or e}")
+            return False
+
+    def head(self) -> str:
+        """The commit at HEAD, or None"""
+        result = self.git('rev-parse', '--verify', '-q', 'HEAD', check=False)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def push_command(self, remote: Dict) -> List[str]:
+        """The `git push` command line sending the branch to one remote"""
+        return ['git', 'push', '--porcelain', remote['url'] or remote['name'],
+                f"refs/heads/{self.branch}:refs/heads/{remote['branch']}"]
+
+    def push(self, remote: Dict) -> Tuple[bool, str]:
+        """Push the branch to one remote within its timeout, returning (ok, detail)"""
+        try:
+            result = subprocess.run(self.push_command(remote), cwd=self.repo_path,
+                                    capture_output=True, text=True, timeout=remote['timeout'])
+        except subprocess.TimeoutExpired:
+            return False, f"timed out after {remote['timeout']:g}s"
+        if result.returncode != 0:
+            return False, push_error(result.stderr, result.returncode)
+        return True, 'ok'
+
+
+class PlumbingBackend(SubprocessBackend):
+    """Batched git plumbing: `hash-object`, `update-index`, `write-tree`, `commit-tree`, `update-ref`
+
+    A burst is hashed by one `hash-object --stdin-paths` and staged by one
+    `update-index --index-info`, with no pathspec matching or work tree
+    scan. Commits skip hooks and status output. The branch tip and its tree
+    are remembered between commits; `update-ref` checks the old value, so a
+    branch moved by someone else is detected rather than overwritten.
+    Pushes are the same as the subprocess backend's.
+    """
+
+    name = 'plumbing'
+
+    def __init__(self, repo_path: str, branch: str = 'main'):
+        super().__init__(repo_path, branch)
+        self.tip = None
+        self.tip_tree = None
+
+    def add(self, paths: List[str], include_removals: bool = False) -> bool:
+        present, removed = [], []
+        for path in paths:
+            (present if os.path.lexists(os.path.join(self.repo_path, path)) else removed).append(path)
+        if removed and not include_removals:
+            logger.error(f"Error adding files to git: {removed[0]} does not exist")
+            return False
+        entries = []
+        try:
+            if present:
+                shas = self.git('hash-object', '-w', '--stdin-paths',
+                                input=''.join(f"{path}\n" for path in present)).stdout.split()
+                for path, sha in zip(present, shas):
+                    executable = os.access(os.path.join(self.repo_path, path), os.X_OK)
+                    entries.append(f"{'100755' if executable else '100644'} {sha}\t{path}")
+            entries += [f"0 {'0' * 40}\t{path}" for path in removed]
+            self.git('update-index', '-z', '--index-info', input=''.join(f"{entry}\0" for entry in entries))
+            return True
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error adding files to git: {e.stderr.strip() or e}")
+            return False
+
+    def read_tip(self):
+        """Load the branch tip and its tree from the repository"""
+        self.tip = super().head()
+        self.tip_tree = self.git('rev-parse', f"{self.tip}^{{tree}}").stdout.strip() if self.tip else None
+
+    def commit(self, message: str) -> bool:
+        try:
+            if self.tip is None:
+                self.read_tip()
+            tree = self.git('write-tree').stdout.strip()
+            # A second attempt follows a branch that moved since the last commit
+            for attempt in range(2):
+                if tree == self.tip_tree:
+                    logger.error("Error committing to git: nothing to commit")
+                    return False
+                parents = ['-p', self.tip] if self.tip else []
+                sha = self.git('commit-tree', tree, *parents, '-m', message).stdout.strip()
+                updated = self.git('update-ref', '-m', f"commit: {message.splitlines()[0]}", 'HEAD', sha,
+                                   self.tip or '0' * 40, check=attempt > 0)
+                if updated.returncode == 0:
+                    break
+                self.read_tip()
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error committing to git: {e.stderr.strip() or e}")
+            self.tip = self.tip_tree = None
+            return False
+        self.tip, self.tip_tree = sha, tree
+        return True
+
+    def head(self) -> str:
+        return self.tip or super().head()
+
+
+class MemoryBackend:
+    """Keeps the index, commits and remote tips in memory; no git at all
+
+    Blobs and commits get git-style SHA-1s, and a burst with nothing new
+    fails to commit as it would in git. Pushes succeed at once and record
+    the remote's tip. Meant for load tests and benchmarks of the generator.
+    """
+
+    name = 'memory'
+
+    def __init__(self, repo_path: str, branch: str = 'main'):
+        self.repo_path = repo_path
+        self.branch = branch
+        self.identity = (None, None)
+        self.index: Dict[str, str] = {}
+        self.blobs: Dict[str, bytes] = {}
+        self.commits: Dict[str, Tuple[str, str, str]] = {}
+        self.tip = None
+        self.tip_tree = None
+        self.remote_tips: Dict[str, str] = {}
+
+    @staticmethod
+    def object_id(kind: str, data: bytes) -> str:
+        return hashlib.sha1(b"%s %d\0%s" % (kind.encode('ascii'), len(data), data)).hexdigest()
+
+    def configure_identity(self, name: str = None, email: str = None) -> bool:
+        self.identity = (name, email)
+        return True
+
+    def add(self, paths: List[str], include_removals: bool = False) -> bool:
+        for path in paths:
+            try:
+                with open(os.path.join(self.repo_path, path), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                if not include_removals:
+                    logger.error(f"Error adding files to git: {path} does not exist")
+                    return False
+                self.index.pop(path, None)
+                continue
+            sha = self.object_id('blob', data)
+            self.blobs[sha] = data
+            self.index[path] = sha
+        return True
+
+    def commit(self, message: str) -> bool:
+        tree = self.object_id('tree', ''.join(f"{path}\0{sha}\n"
+                                              for path, sha in sorted(self.index.items())).encode('utf-8'))
+        if tree == self.tip_tree:
+            logger.error("Error committing to git: nothing to commit")
+            return False
+        sha = self.object_id('commit', f"tree {tree}\nparent {self.tip}\n\n{message}".encode('utf-8'))
+        self.commits[sha] = (self.tip, tree, message)
+        self.tip, self.tip_tree = sha, tree
+        return True
+
+    def head(self) -> str:
+        return self.tip
+
+    def push_command(self, remote: Dict) -> List[str]:
+        """None: pushes happen in-process"""
+        return None
+
+    def push(self, remote: Dict) -> Tuple[bool, str]:
+        self.remote_tips[remote['name']] = self.tip
+        return True, 'ok'
+
+
+BACKENDS = {backend.name: backend for backend in (SubprocessBackend, PlumbingBackend, MemoryBackend)}
+
+
+def create_backend(name: str, repo_path: str, branch: str = 'main'):
+    """Instantiate the named backend, falling back to subprocess for unknown names"""
+    if name not in BACKENDS:
+        logger.warning(f"Unknown vcs_backend {name!r}, using 'subprocess'")
+        name = 'subprocess'
+    return BACKENDS[name](repo_path, branch)